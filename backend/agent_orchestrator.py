@@ -4,8 +4,23 @@ Manages the multi-agent workflow and consolidates results
 """
 
 from typing import Dict, List, Any
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import time
+from agents.risk_scoring_agent import invalidate_weights
 from agents.supervisor_agent import SupervisorAgent
 from deterministic_tests import run_all_deterministic_tests
+from html_utils import index_elements, parse_html
+
+# Shared pool so the deterministic tests and sub-agent analyses run side by side
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="qa-agent")
+
+# Last formatted timestamp as (epoch second, ISO string), reused within the same second
+_timestamp_cache = (0, "")
+
+# Orchestrator owned by a QA worker process, and the rule weights generation it last saw
+_worker_orchestrator = None
+_worker_weights_generation = 0
 
 
 class AgentOrchestrator:
@@ -24,13 +39,23 @@ class AgentOrchestrator:
         Returns:
             Dict containing the consolidated QA report
         """
-        # Run deterministic tests
-        deterministic_results = run_all_deterministic_tests(html_content, metadata)
+        # Parse and index the HTML once so the agents share a single tree walk
+        parsed_tree = parse_html(html_content)
+        element_index = index_elements(parsed_tree)
+        
+        # Run deterministic tests and each sub-agent analysis concurrently
+        deterministic_future = _EXECUTOR.submit(run_all_deterministic_tests, html_content, metadata, parsed_tree)
+        agent_futures = {
+            name: _EXECUTOR.submit(task)
+            for name, task in self.supervisor_agent.analysis_tasks(
+                email_id, html_content, metadata, parsed_tree, element_index
+            ).items()
+        }
+        deterministic_results = deterministic_future.result()
+        agent_results = {name: future.result() for name, future in agent_futures.items()}
         
-        # Run agentic workflow through supervisor
-        agentic_results = self.supervisor_agent.process_email(
-            email_id, html_content, metadata, deterministic_results
-        )
+        # Score and merge the results through the supervisor
+        agentic_results = self.supervisor_agent.consolidate_results(agent_results, deterministic_results)
         
         # Consolidate results
         consolidated_report = {
@@ -61,9 +86,30 @@ class AgentOrchestrator:
             return "pass"
     
     def _get_current_timestamp(self) -> str:
-        """Get current timestamp"""
-        from datetime import datetime
-        return datetime.now().isoformat()
+        """Get current timestamp (second precision)"""
+        global _timestamp_cache
+        now = int(time.time())
+        cached_second, cached_value = _timestamp_cache
+        if now != cached_second:
+            cached_value = datetime.fromtimestamp(now).isoformat()
+            _timestamp_cache = (now, cached_value)
+        return cached_value
+
+
+def run_qa_in_worker(weights_generation: int, email_id: str, html_content: str,
+                     metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the QA process inside a worker process (see api.endpoints)
+    
+    weights_generation is the parent's risk_scoring_agent.weights_generation(); when it
+    has moved on since the last run, this process reloads its rule weights.
+    """
+    global _worker_orchestrator, _worker_weights_generation
+    if _worker_orchestrator is None:
+        _worker_orchestrator = AgentOrchestrator()
+    if weights_generation != _worker_weights_generation:
+        invalidate_weights()
+        _worker_weights_generation = weights_generation
+    return _worker_orchestrator.run_qa_process(email_id, html_content, metadata)
 
 
 # Example usage
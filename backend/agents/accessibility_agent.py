@@ -3,18 +3,84 @@ Accessibility Agent for the Email QA Agentic Platform
 Checks WCAG compliance, ALT text quality, semantic HTML, and color contrast
 """
 
-from typing import Dict, Any
-from bs4 import BeautifulSoup
+from typing import Dict, Any, List, Optional, Set, Tuple
+from functools import lru_cache
+from io import BytesIO
+from lxml import etree
+import lxml.html
 import re
+from html_utils import index_elements, parse_html
+
+
+# The only elements the accessibility checks ever look at
+_ACCESSIBILITY_TAGS = ('img', 'a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li')
+_HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Emails larger than this are streamed through iterparse when no tree is supplied
+_STREAM_THRESHOLD = 1024 * 1024
+
+# Same result as HtmlElement.text_content(), but also works on plain etree elements
+_text_content = etree.XPath('string()')
+
+# Placeholder ALT text and generic link text that describe nothing
+_ALT_BAD = frozenset({'image', 'photo', 'picture', 'graphic'})
+_LINK_BAD = frozenset({'click here', 'read more', 'link', 'here'})
+
+# Inline color declarations used by the contrast check
+_COLOR_RE = re.compile(r'color\s*:\s*#[0-9a-fA-F]{3,6}')
+_BG_RE = re.compile(r'background(?:-color)?\s*:\s*#[0-9a-fA-F]{3,6}')
+
+# Inline style attributes and the fg/bg hex colors declared inside them
+_STYLE_ATTR_RE = re.compile(r'style\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+_STYLE_FG_RE = re.compile(r'(?<![-\w])color\s*:\s*#([0-9a-fA-F]{6}|[0-9a-fA-F]{3})\b', re.IGNORECASE)
+_STYLE_BG_RE = re.compile(r'background(?:-color)?\s*:[^;]*?#([0-9a-fA-F]{6}|[0-9a-fA-F]{3})\b', re.IGNORECASE)
+
+
+def _pack_hex(hex_color: str) -> int:
+    """Pack a 3- or 6-digit hex color (without '#') into a 24-bit int"""
+    if len(hex_color) == 3:
+        hex_color = ''.join(c * 2 for c in hex_color)
+    return int(hex_color, 16)
+
+
+def _relative_luminance(rgb: int) -> float:
+    """WCAG relative luminance of a packed 24-bit color"""
+    channels: List[float] = []
+    for shift in (16, 8, 0):
+        c = ((rgb >> shift) & 0xFF) / 255.0
+        channels.append(c / 12.92 if c <= 0.03928 else ((c + 0.055) / 1.055) ** 2.4)
+    return 0.2126 * channels[0] + 0.7152 * channels[1] + 0.0722 * channels[2]
+
+
+@lru_cache(maxsize=4096)
+def _contrast_ratio(fg: int, bg: int) -> float:
+    """WCAG contrast ratio between two packed colors, from 1.0 to 21.0"""
+    l1 = _relative_luminance(fg)
+    l2 = _relative_luminance(bg)
+    if l1 < l2:
+        l1, l2 = l2, l1
+    return (l1 + 0.05) / (l2 + 0.05)
+
+
+def _count_elements(elements: Dict[str, List[lxml.html.HtmlElement]]) -> Dict[str, int]:
+    """Reduce an element index to per-tag counts of the accessibility tags"""
+    return {tag: len(elements[tag]) for tag in _ACCESSIBILITY_TAGS}
+
+
+def _snippet(element: lxml.html.HtmlElement) -> str:
+    """Serialize an element (without its tail) for issue descriptions"""
+    return lxml.html.tostring(element, encoding='unicode', with_tail=False)
 
 
 class AccessibilityAgent:
     def __init__(self):
         # Define accessibility standards
-        self.min_contrast_ratio = 4.5  # WCAG AA standard
-        self.max_link_text_length = 80  # Recommended max length
+        self.min_contrast_ratio: float = 4.5  # WCAG AA standard
+        self.max_link_text_length: int = 80  # Recommended max length
     
-    def analyze(self, email_id: str, html_content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze(self, email_id: str, html_content: str, metadata: Dict[str, Any],
+                parsed_tree: Optional[lxml.html.HtmlElement] = None,
+                element_index: Optional[Dict[str, List[lxml.html.HtmlElement]]] = None) -> Dict[str, Any]:
         """
         Analyze email for accessibility issues
         
@@ -22,25 +88,36 @@ class AccessibilityAgent:
             email_id: Unique identifier for the email
             html_content: HTML content of the email
             metadata: Metadata associated with the email
+            parsed_tree: Pre-parsed tree of html_content, parsed here if omitted
+            element_index: Shared per-tag element index of parsed_tree, built here if omitted
             
         Returns:
             Dict containing accessibility analysis results
         """
-        issues = []
+        issues: List[Dict[str, str]] = []
         
-        # Parse HTML content
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if element_index is None and parsed_tree is None and len(html_content) > _STREAM_THRESHOLD:
+            # Large email: classify elements while streaming instead of building a full tree
+            counts, alt_text_issues, link_text_issues = self._scan_streaming(html_content)
+        else:
+            # Reuse the caller's parse and index when available, else collect the elements in one walk
+            elements = element_index
+            if elements is None:
+                if parsed_tree is None:
+                    parsed_tree = parse_html(html_content)
+                elements = index_elements(parsed_tree, _ACCESSIBILITY_TAGS)
+            counts = _count_elements(elements)
+            alt_text_issues = self._check_alt_text_quality(elements)
+            link_text_issues = self._check_link_text_clarity(elements)
         
         # Check ALT text quality
-        alt_text_issues = self._check_alt_text_quality(soup)
         issues.extend(alt_text_issues)
         
         # Check semantic HTML structure
-        semantic_issues = self._check_semantic_html(soup)
+        semantic_issues = self._check_semantic_html(counts)
         issues.extend(semantic_issues)
         
         # Check link text clarity
-        link_text_issues = self._check_link_text_clarity(soup)
         issues.extend(link_text_issues)
         
         # Check color contrast (simplified)
@@ -54,46 +131,98 @@ class AccessibilityAgent:
             "summary": f"Found {len(issues)} accessibility issues"
         }
     
-    def _check_alt_text_quality(self, soup: BeautifulSoup) -> list:
+    def _scan_streaming(self, html_content: str) -> Tuple[Dict[str, int], List[Dict[str, str]], List[Dict[str, str]]]:
+        """
+        Classify elements from iterparse events, discarding each subtree once handled
+        
+        Returns:
+            Tuple of (per-tag counts, ALT text issues, link text issues)
+        """
+        counts: Dict[str, int] = dict.fromkeys(_ACCESSIBILITY_TAGS, 0)
+        alt_text_issues: List[Dict[str, str]] = []
+        link_text_issues: List[Dict[str, str]] = []
+        open_links = 0
+        
+        events = etree.iterparse(BytesIO(html_content.encode('utf-8')), events=('start', 'end'),
+                                 html=True, encoding='utf-8')
+        try:
+            for event, element in events:
+                tag = element.tag
+                if event == 'start':
+                    if tag == 'a':
+                        open_links += 1
+                    continue
+                
+                if tag in counts:
+                    counts[tag] += 1
+                    if tag == 'img':
+                        issue = self._image_issue(element)
+                        if issue:
+                            alt_text_issues.append(issue)
+                    elif tag == 'a':
+                        open_links -= 1
+                        if element.get('href') is not None:
+                            issue = self._link_issue(element)
+                            if issue:
+                                link_text_issues.append(issue)
+                
+                # Link text is read at the link's end event, so keep its subtree until then
+                if not open_links:
+                    element.clear(keep_tail=True)
+                    while element.getprevious() is not None:
+                        del element.getparent()[0]
+        except etree.XMLSyntaxError:
+            # Empty document: nothing to classify
+            pass
+        
+        return counts, alt_text_issues, link_text_issues
+    
+    def _image_issue(self, img: etree._Element) -> Optional[Dict[str, str]]:
+        """Classify a single image's ALT text, returning an issue or None"""
+        alt_text = img.get('alt', '').strip()
+        
+        # Check if ALT text is missing
+        if not alt_text:
+            return {
+                "rule": "alt_text_quality",
+                "description": f"Image missing descriptive ALT text: {_snippet(img)[:50]}...",
+                "severity": "high"
+            }
+        # Check if ALT text is placeholder text
+        if alt_text.lower() in _ALT_BAD:
+            return {
+                "rule": "alt_text_quality",
+                "description": f"Image has non-descriptive ALT text: '{alt_text}'",
+                "severity": "medium"
+            }
+        # Check if ALT text is too long
+        if len(alt_text) > 125:  # Recommended max length
+            return {
+                "rule": "alt_text_quality",
+                "description": f"ALT text is too long ({len(alt_text)} chars): '{alt_text[:50]}...'",
+                "severity": "low"
+            }
+        return None
+    
+    def _check_alt_text_quality(self, elements: Dict[str, List[lxml.html.HtmlElement]]) -> List[Dict[str, str]]:
         """Check quality of ALT text"""
-        issues = []
-        images = soup.find_all('img')
+        issues: List[Dict[str, str]] = []
         
-        for img in images:
-            alt_text = img.get('alt', '').strip()
-            
-            # Check if ALT text is missing
-            if not alt_text:
-                issues.append({
-                    "rule": "alt_text_quality",
-                    "description": f"Image missing descriptive ALT text: {str(img)[:50]}...",
-                    "severity": "high"
-                })
-            # Check if ALT text is placeholder text
-            elif alt_text.lower() in ['image', 'photo', 'picture', 'graphic']:
-                issues.append({
-                    "rule": "alt_text_quality",
-                    "description": f"Image has non-descriptive ALT text: '{alt_text}'",
-                    "severity": "medium"
-                })
-            # Check if ALT text is too long
-            elif len(alt_text) > 125:  # Recommended max length
-                issues.append({
-                    "rule": "alt_text_quality",
-                    "description": f"ALT text is too long ({len(alt_text)} chars): '{alt_text[:50]}...'",
-                    "severity": "low"
-                })
+        for img in elements['img']:
+            issue = self._image_issue(img)
+            if issue:
+                issues.append(issue)
         
         return issues
     
-    def _check_semantic_html(self, soup: BeautifulSoup) -> list:
-        """Check for proper semantic HTML structure"""
-        issues = []
+    def _check_semantic_html(self, counts: Dict[str, int]) -> List[Dict[str, str]]:
+        """Check for proper semantic HTML structure from per-tag element counts"""
+        issues: List[Dict[str, str]] = []
         
-        # Check for heading structure
-        headings = soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
+        # Check for heading structure (stops at the first non-empty heading bucket)
+        has_headings = any(counts[tag] for tag in _HEADING_TAGS)
         
-        if not headings:
+        if not has_headings:
             issues.append({
                 "rule": "semantic_html",
                 "description": "No heading elements found",
@@ -101,14 +230,14 @@ class AccessibilityAgent:
             })
         else:
             # Check if h1 is present
-            h1_tags = soup.find_all('h1')
-            if not h1_tags:
+            h1_count = counts['h1']
+            if not h1_count:
                 issues.append({
                     "rule": "semantic_html",
                     "description": "Missing main heading (h1)",
                     "severity": "medium"
                 })
-            elif len(h1_tags) > 1:
+            elif h1_count > 1:
                 issues.append({
                     "rule": "semantic_html",
                     "description": "Multiple h1 headings found",
@@ -116,10 +245,9 @@ class AccessibilityAgent:
                 })
         
         # Check for proper list structure
-        lists = soup.find_all(['ul', 'ol'])
-        list_items = soup.find_all('li')
+        has_lists = counts['ul'] or counts['ol']
         
-        if list_items and not lists:
+        if counts['li'] and not has_lists:
             issues.append({
                 "rule": "semantic_html",
                 "description": "List items found without proper list container",
@@ -128,50 +256,76 @@ class AccessibilityAgent:
         
         return issues
     
-    def _check_link_text_clarity(self, soup: BeautifulSoup) -> list:
+    def _link_issue(self, link: etree._Element) -> Optional[Dict[str, str]]:
+        """Classify a single link's text, returning an issue or None"""
+        link_text = _text_content(link).strip()
+        
+        # Check if link text is missing
+        if not link_text:
+            return {
+                "rule": "link_text_clarity",
+                "description": f"Link with no text content: {_snippet(link)[:50]}...",
+                "severity": "high"
+            }
+        # Check if link text is too generic
+        if link_text.lower() in _LINK_BAD:
+            return {
+                "rule": "link_text_clarity",
+                "description": f"Non-descriptive link text: '{link_text}'",
+                "severity": "medium"
+            }
+        # Check if link text is too long
+        if len(link_text) > self.max_link_text_length:
+            return {
+                "rule": "link_text_clarity",
+                "description": f"Link text is too long ({len(link_text)} chars): '{link_text[:50]}...'",
+                "severity": "low"
+            }
+        return None
+    
+    def _check_link_text_clarity(self, elements: Dict[str, List[lxml.html.HtmlElement]]) -> List[Dict[str, str]]:
         """Check link text for clarity and descriptiveness"""
-        issues = []
-        links = soup.find_all('a', href=True)
+        issues: List[Dict[str, str]] = []
         
-        for link in links:
-            link_text = link.get_text(strip=True)
-            
-            # Check if link text is missing
-            if not link_text:
-                issues.append({
-                    "rule": "link_text_clarity",
-                    "description": f"Link with no text content: {str(link)[:50]}...",
-                    "severity": "high"
-                })
-            # Check if link text is too generic
-            elif link_text.lower() in ['click here', 'read more', 'link', 'here']:
-                issues.append({
-                    "rule": "link_text_clarity",
-                    "description": f"Non-descriptive link text: '{link_text}'",
-                    "severity": "medium"
-                })
-            # Check if link text is too long
-            elif len(link_text) > self.max_link_text_length:
-                issues.append({
-                    "rule": "link_text_clarity",
-                    "description": f"Link text is too long ({len(link_text)} chars): '{link_text[:50]}...'",
-                    "severity": "low"
-                })
+        for link in elements['a']:
+            if link.get('href') is None:
+                continue
+            issue = self._link_issue(link)
+            if issue:
+                issues.append(issue)
         
         return issues
     
-    def _check_color_contrast(self, html_content: str) -> list:
-        """Check color contrast (simplified implementation)"""
-        issues = []
+    def _check_color_contrast(self, html_content: str) -> List[Dict[str, str]]:
+        """Check color contrast of inline text/background color pairs"""
+        issues: List[Dict[str, str]] = []
         
-        # This is a simplified check - in practice, this would use a color contrast analyzer
-        # For now, we'll just flag if no explicit contrast checking is done
+        # Compare every inline style that declares both a text and a background color
+        checked_pairs: Set[Tuple[int, int]] = set()
+        for match in _STYLE_ATTR_RE.finditer(html_content):
+            style = match.group(1) if match.group(1) is not None else match.group(2)
+            fg = _STYLE_FG_RE.search(style)
+            bg = _STYLE_BG_RE.search(style)
+            if fg is None or bg is None:
+                continue
+            # Normalize #RGB/#RRGGBB spellings to one packed fingerprint per pair
+            pair = (_pack_hex(fg.group(1)), _pack_hex(bg.group(1)))
+            if pair in checked_pairs:
+                continue
+            checked_pairs.add(pair)
+            
+            ratio = _contrast_ratio(*pair)
+            if ratio < self.min_contrast_ratio:
+                issues.append({
+                    "rule": "color_contrast",
+                    "description": f"Insufficient color contrast {ratio:.2f}:1 between #{pair[0]:06x} text and #{pair[1]:06x} background (minimum {self.min_contrast_ratio}:1)",
+                    "severity": "medium"
+                })
         
-        # Look for inline styles with color declarations
-        color_styles = re.findall(r'color\s*:\s*#[0-9a-fA-F]{3,6}', html_content)
-        background_styles = re.findall(r'background(-color)?\s*:\s*#[0-9a-fA-F]{3,6}', html_content)
+        # Look for inline styles with color declarations (only presence matters)
+        has_color_styles = _COLOR_RE.search(html_content) is not None
         
-        if color_styles and not background_styles:
+        if has_color_styles and _BG_RE.search(html_content) is None:
             issues.append({
                 "rule": "color_contrast",
                 "description": "Text color specified without background color - contrast cannot be verified",
@@ -3,33 +3,100 @@ Compliance Agent for the Email QA Agentic Platform
 Checks brand compliance including fonts, colors, spacing, logos, and headers/footers
 """
 
-from typing import Dict, Any
-import yaml
+from typing import Dict, Any, Iterable, Set, Tuple
+from functools import lru_cache
+import ahocorasick
 import os
+import re
+
+
+# Header/footer markup, matched case-insensitively without copying the HTML
+_HEADER_RE = re.compile(r'<header|<div class=[\'"]header[\'"]', re.IGNORECASE)
+_FOOTER_RE = re.compile(r'<footer|<div class=[\'"]footer[\'"]', re.IGNORECASE)
+
+
+@lru_cache(maxsize=1)
+def _load_brand_rules_cached() -> Dict[str, Any]:
+    """Load brand rules from config file once per process"""
+    # Imported lazily so processes that never run the compliance checks skip the cost
+    import yaml
+    
+    # Prefer the libyaml C loader when PyYAML was built with it
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    try:
+        config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'brand_rules.yaml')
+        with open(config_path, 'r') as file:
+            return yaml.load(file, Loader=loader)
+    except FileNotFoundError:
+        # Return default rules if config file not found
+        return {
+            "font_family": "Arial",
+            "cta_color": "#0085FF",
+            "header_logo": "brandlogo.png",
+            "spacing": {
+                "top_padding": "24px",
+                "bottom_padding": "24px"
+            }
+        }
 
 
 class ComplianceAgent:
     def __init__(self):
         # Load brand rules
         self.brand_rules = self._load_brand_rules()
+        
+        # Brand markers that must appear in the HTML, matched in a single pass
+        self.brand_markers = self._build_brand_markers()
+        self.accepted_logos = self._build_accepted_logos()
+        self._marker_automaton = self._build_marker_automaton(
+            list(self.brand_markers.values()) + list(self.accepted_logos)
+        )
     
     def _load_brand_rules(self) -> Dict[str, Any]:
-        """Load brand rules from config file"""
-        try:
-            config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'brand_rules.yaml')
-            with open(config_path, 'r') as file:
-                return yaml.safe_load(file)
-        except FileNotFoundError:
-            # Return default rules if config file not found
-            return {
-                "font_family": "Arial",
-                "cta_color": "#0085FF",
-                "header_logo": "brandlogo.png",
-                "spacing": {
-                    "top_padding": "24px",
-                    "bottom_padding": "24px"
-                }
-            }
+        """Load brand rules (parsed once and shared by all instances)"""
+        return _load_brand_rules_cached()
+    
+    def _build_brand_markers(self) -> Dict[str, str]:
+        """Derive the literal strings each brand check looks for"""
+        spacing_rules = self.brand_rules.get("spacing", {})
+        return {
+            "font": f'font-family: {self.brand_rules.get("font_family", "Arial")}',
+            "cta_color": self.brand_rules.get("cta_color", "#0085FF"),
+            "top_padding": spacing_rules.get("top_padding", "24px"),
+            "bottom_padding": spacing_rules.get("bottom_padding", "24px"),
+            "logo": self.brand_rules.get("header_logo", "brandlogo.png"),
+        }
+    
+    def _build_accepted_logos(self) -> Tuple[str, ...]:
+        """Collect the primary header logo plus any alternates from the brand rules"""
+        logos = [self.brand_markers["logo"]]
+        logos.extend(self.brand_rules.get("header_logos") or [])
+        # Preserve order (the primary logo is reported first) while dropping duplicates
+        return tuple(dict.fromkeys(logo for logo in logos if logo))
+    
+    def _build_marker_automaton(self, markers: Iterable[str]) -> ahocorasick.Automaton:
+        """Build an Aho-Corasick automaton over the brand markers"""
+        automaton = ahocorasick.Automaton()
+        for marker in markers:
+            if marker:
+                automaton.add_word(marker, marker)
+        if len(automaton):
+            automaton.make_automaton()
+        return automaton
+    
+    def _find_brand_markers(self, html_content: str) -> Set[str]:
+        """Return the brand markers present in the HTML using one scan"""
+        found = set()
+        total = len(self._marker_automaton)
+        if not total:
+            return found
+        
+        for _, marker in self._marker_automaton.iter(html_content):
+            found.add(marker)
+            # Stop scanning once every marker has been seen
+            if len(found) == total:
+                break
+        return found
     
     def analyze(self, email_id: str, html_content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -45,20 +112,23 @@ class ComplianceAgent:
         """
         issues = []
         
+        # Scan the HTML once for every brand marker
+        found_markers = self._find_brand_markers(html_content)
+        
         # Check font family compliance
-        font_issues = self._check_font_compliance(html_content)
+        font_issues = self._check_font_compliance(found_markers)
         issues.extend(font_issues)
         
         # Check CTA button color compliance
-        cta_issues = self._check_cta_color_compliance(html_content)
+        cta_issues = self._check_cta_color_compliance(found_markers)
         issues.extend(cta_issues)
         
         # Check spacing rules compliance
-        spacing_issues = self._check_spacing_compliance(html_content)
+        spacing_issues = self._check_spacing_compliance(found_markers)
         issues.extend(spacing_issues)
         
         # Check logo placement
-        logo_issues = self._check_logo_placement(html_content)
+        logo_issues = self._check_logo_placement(found_markers)
         issues.extend(logo_issues)
         
         # Check header/footer consistency
@@ -72,13 +142,13 @@ class ComplianceAgent:
             "summary": f"Found {len(issues)} compliance issues"
         }
     
-    def _check_font_compliance(self, html_content: str) -> list:
+    def _check_font_compliance(self, found_markers: Set[str]) -> list:
         """Check if fonts comply with brand guidelines"""
         issues = []
         brand_font = self.brand_rules.get("font_family", "Arial")
         
         # Simple check for font-family in styles
-        if f'font-family: {brand_font}' not in html_content:
+        if self.brand_markers["font"] not in found_markers:
             issues.append({
                 "rule": "font_compliance",
                 "description": f"Font does not match brand guidelines. Expected: {brand_font}",
@@ -87,13 +157,13 @@ class ComplianceAgent:
         
         return issues
     
-    def _check_cta_color_compliance(self, html_content: str) -> list:
+    def _check_cta_color_compliance(self, found_markers: Set[str]) -> list:
         """Check if CTA button colors comply with brand guidelines"""
         issues = []
-        brand_cta_color = self.brand_rules.get("cta_color", "#0085FF")
+        brand_cta_color = self.brand_markers["cta_color"]
         
         # Simple check for CTA color in styles
-        if brand_cta_color not in html_content:
+        if brand_cta_color not in found_markers:
             issues.append({
                 "rule": "cta_color_compliance",
                 "description": f"CTA button color does not match brand guidelines. Expected: {brand_cta_color}",
@@ -102,14 +172,13 @@ class ComplianceAgent:
         
         return issues
     
-    def _check_spacing_compliance(self, html_content: str) -> list:
+    def _check_spacing_compliance(self, found_markers: Set[str]) -> list:
         """Check if spacing complies with brand guidelines"""
         issues = []
-        spacing_rules = self.brand_rules.get("spacing", {})
         
         # Check top padding
-        top_padding = spacing_rules.get("top_padding", "24px")
-        if top_padding not in html_content:
+        top_padding = self.brand_markers["top_padding"]
+        if top_padding not in found_markers:
             issues.append({
                 "rule": "spacing_compliance",
                 "description": f"Top padding does not match brand guidelines. Expected: {top_padding}",
@@ -117,8 +186,8 @@ class ComplianceAgent:
             })
         
         # Check bottom padding
-        bottom_padding = spacing_rules.get("bottom_padding", "24px")
-        if bottom_padding not in html_content:
+        bottom_padding = self.brand_markers["bottom_padding"]
+        if bottom_padding not in found_markers:
             issues.append({
                 "rule": "spacing_compliance",
                 "description": f"Bottom padding does not match brand guidelines. Expected: {bottom_padding}",
@@ -127,16 +196,15 @@ class ComplianceAgent:
         
         return issues
     
-    def _check_logo_placement(self, html_content: str) -> list:
+    def _check_logo_placement(self, found_markers: Set[str]) -> list:
         """Check if logo placement complies with brand guidelines"""
         issues = []
-        brand_logo = self.brand_rules.get("header_logo", "brandlogo.png")
         
-        # Check if brand logo is present
-        if brand_logo not in html_content:
+        # Check if any accepted brand logo is present
+        if not any(logo in found_markers for logo in self.accepted_logos):
             issues.append({
                 "rule": "logo_placement",
-                "description": f"Brand logo not found. Expected: {brand_logo}",
+                "description": f"Brand logo not found. Expected: {', '.join(self.accepted_logos)}",
                 "severity": "medium"
             })
         
@@ -147,14 +215,14 @@ class ComplianceAgent:
         issues = []
         
         # Simple checks for header/footer presence
-        if "<header" not in html_content.lower() and "<div class='header'" not in html_content.lower():
+        if _HEADER_RE.search(html_content) is None:
             issues.append({
                 "rule": "header_consistency",
                 "description": "Header section not found or inconsistent",
                 "severity": "low"
             })
         
-        if "<footer" not in html_content.lower() and "<div class='footer'" not in html_content.lower():
+        if _FOOTER_RE.search(html_content) is None:
             issues.append({
                 "rule": "footer_consistency",
                 "description": "Footer section not found or inconsistent",
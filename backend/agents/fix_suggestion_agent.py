@@ -3,197 +3,208 @@ Fix Suggestion Agent for the Email QA Agentic Platform
 Generates actionable fixes for identified issues
 """
 
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Mapping, Optional
+from collections import ChainMap
+from string import Formatter
+from types import MappingProxyType
+from agents.issues import Issue, collect_all_issues
+
+
+# Suggestion template per test name or issue rule (read-only, shared by all instances)
+_FIX_TEMPLATES = MappingProxyType({
+    "alt_text": "Add descriptive ALT text to image: {element}",
+    "links": "Fix malformed link: {url}",
+    "subject_line": "Add a compelling subject line",
+    "preheader": "Add a preheader text",
+    "template_meta": "Add missing template metadata: {missing_field}",
+    "width": "Specify width attributes for email elements",
+    "background_color": "Define background colors for all sections",
+    "image_dimensions": "Add width and height attributes to image: {element}",
+    "long_copy": "Break up long text block into shorter paragraphs (aim for <150 characters per line)",
+    "font_compliance": "Update font family to brand standard: {expected_font}",
+    "cta_color_compliance": "Update CTA button color to brand standard: {expected_color}",
+    "spacing_compliance": "Adjust spacing to brand guidelines: {spacing_rule}",
+    "logo_placement": "Add brand logo to header: {expected_logo}",
+    "header_consistency": "Ensure consistent header structure",
+    "footer_consistency": "Ensure consistent footer structure",
+    "broken_links": "Verify and fix broken link: {url}",
+    "complex_sentences": "Simplify complex sentence structure",
+    "clarity": "Rewrite passive voice to active voice",
+    "grammar": "Fix grammar issue: {grammar_issue}",
+    "alt_text_quality": "Improve ALT text descriptiveness: {current_text}",
+    "semantic_html": "Add proper heading structure",
+    "link_text_clarity": "Make link text more descriptive: {current_text}",
+    "color_contrast": "Ensure sufficient color contrast for readability"
+})
+
+# Bucket index of each fix priority (unknown priorities sort with medium)
+_PRIORITY_RANK = {"critical": 1, "high": 2, "medium": 3, "low": 4}
+_DEFAULT_PRIORITY_RANK = _PRIORITY_RANK["medium"]
+
+
+class _SafeFormatMap(ChainMap):
+    """Template lookup that leaves unknown fields as literal placeholders"""
+    
+    def __missing__(self, key: str) -> str:
+        return "{" + key + "}"
+
+
+def _compile_template(template: str, defaults: Mapping[str, str]) -> Callable[[Mapping[str, Any]], str]:
+    """
+    Pre-parse a fix template into a renderer taking the issue dict
+    
+    Fields resolve from the issue, then the defaults, and are otherwise left
+    as literal placeholders, matching format_map with _SafeFormatMap.
+    """
+    parts = []
+    for literal, field, format_spec, conversion in Formatter().parse(template):
+        if field is not None and (format_spec or conversion or not field.isidentifier()):
+            # Positional, attribute/index or formatted fields: defer to str.format_map
+            return lambda values: template.format_map(_SafeFormatMap(values, defaults))
+        parts.append((literal, field))
+    
+    # Templates without fields render to the same string every time
+    if all(field is None for _, field in parts):
+        constant = "".join(literal for literal, _ in parts)
+        return lambda values: constant
+    
+    def render(values: Mapping[str, Any]) -> str:
+        pieces = []
+        for literal, field in parts:
+            pieces.append(literal)
+            if field is None:
+                continue
+            if field in values:
+                pieces.append(format(values[field]))
+            elif field in defaults:
+                pieces.append(format(defaults[field]))
+            else:
+                pieces.append("{" + field + "}")
+        return "".join(pieces)
+    
+    return render
 
 
 class FixSuggestionAgent:
+    # Placeholder values for template fields an issue does not provide
+    _TEMPLATE_DEFAULTS = {
+        "element": "element",
+        "url": "link",
+        "missing_field": "field",
+        "expected_font": "Arial",
+        "expected_color": "#0085FF",
+        "spacing_rule": "padding",
+        "expected_logo": "logo",
+        "spam_text": "text",
+        "grammar_issue": "issue",
+        "current_text": "text",
+        "description": "issue"
+    }
+    
     def __init__(self):
-        # Define fix templates
-        self.fix_templates = {
-            "alt_text": "Add descriptive ALT text to image: {element}",
-            "links": "Fix malformed link: {url}",
-            "subject_line": "Add a compelling subject line",
-            "preheader": "Add a preheader text",
-            "template_meta": "Add missing template metadata: {missing_field}",
-            "width": "Specify width attributes for email elements",
-            "background_color": "Define background colors for all sections",
-            "image_dimensions": "Add width and height attributes to image: {element}",
-            "long_copy": "Break up long text block into shorter paragraphs (aim for <150 characters per line)",
-            "font_compliance": "Update font family to brand standard: {expected_font}",
-            "cta_color_compliance": "Update CTA button color to brand standard: {expected_color}",
-            "spacing_compliance": "Adjust spacing to brand guidelines: {spacing_rule}",
-            "logo_placement": "Add brand logo to header: {expected_logo}",
-            "header_consistency": "Ensure consistent header structure",
-            "footer_consistency": "Ensure consistent footer structure",
-            "broken_links": "Verify and fix broken link: {url}",
-            "complex_sentences": "Simplify complex sentence structure",
-            "clarity": "Rewrite passive voice to active voice",
-            "grammar": "Fix grammar issue: {grammar_issue}",
-            "alt_text_quality": "Improve ALT text descriptiveness: {current_text}",
-            "semantic_html": "Add proper heading structure",
-            "link_text_clarity": "Make link text more descriptive: {current_text}",
-            "color_contrast": "Ensure sufficient color contrast for readability"
+        # Fix templates are invariant, so every instance shares the module-level table
+        self.fix_templates = _FIX_TEMPLATES
+        
+        # Parse every template once; the generators only do lookups and joins per issue
+        self._compiled_templates = {
+            name: _compile_template(template, self._TEMPLATE_DEFAULTS)
+            for name, template in self.fix_templates.items()
+        }
+        self._default_deterministic_template = _compile_template("Fix {test_name} issue", self._TEMPLATE_DEFAULTS)
+        self._default_compliance_template = _compile_template("Fix compliance issue: {description}", self._TEMPLATE_DEFAULTS)
+        self._default_tone_template = _compile_template("Improve tone/clarity: {description}", self._TEMPLATE_DEFAULTS)
+        self._default_accessibility_template = _compile_template("Improve accessibility: {description}", self._TEMPLATE_DEFAULTS)
+        
+        # Fix generator per issue category, bound once instead of per generate_fixes call
+        self._fix_generators = {
+            "deterministic": self._generate_deterministic_fix,
+            "compliance": self._generate_compliance_fix,
+            "tone": self._generate_tone_fix,
+            "accessibility": self._generate_accessibility_fix
         }
     
-    def generate_fixes(self, all_agent_results: Dict[str, Any], risk_results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def generate_fixes(self, all_agent_results: Dict[str, Any],
+                       issues: Optional[List[Issue]] = None) -> List[Dict[str, Any]]:
         """
         Generate fix suggestions based on all analysis results
         
         Args:
             all_agent_results: Combined results from all agents
-            risk_results: Risk scoring results
+            issues: Pre-walked Issue list of all_agent_results, walked here if omitted
             
         Returns:
             List of fix suggestions
         """
-        fixes = []
-        
-        # Generate fixes from deterministic test results
-        deterministic_results = all_agent_results.get("deterministic", [])
-        for test in deterministic_results:
-            if test["status"] == "fail":
-                fix = self._generate_deterministic_fix(test)
-                if fix:
-                    fixes.append(fix)
-        
-        # Generate fixes from compliance results
-        compliance_results = all_agent_results.get("compliance", {})
-        for issue in compliance_results.get("issues", []):
-            fix = self._generate_compliance_fix(issue)
-            if fix:
-                fixes.append(fix)
-        
-        # Generate fixes from tone results
-        tone_results = all_agent_results.get("tone", {})
-        for issue in tone_results.get("issues", []):
-            fix = self._generate_tone_fix(issue)
-            if fix:
-                fixes.append(fix)
+        if issues is None:
+            issues = collect_all_issues(all_agent_results)
         
-        # Generate fixes from accessibility results
-        accessibility_results = all_agent_results.get("accessibility", {})
-        for issue in accessibility_results.get("issues", []):
-            fix = self._generate_accessibility_fix(issue)
-            if fix:
-                fixes.append(fix)
+        # Generate one fix per failed test or agent issue, in walk order
+        generators = self._fix_generators
+        fixes = [fix for fix in (generators[issue.category](issue) for issue in issues) if fix]
         
         # Prioritize fixes based on severity
-        fixes = self._prioritize_fixes(fixes)
+        self._prioritize_fixes_inplace(fixes)
         
         return fixes
     
-    def _generate_deterministic_fix(self, test_result: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_deterministic_fix(self, test_result: Issue) -> Dict[str, Any]:
         """Generate fix for deterministic test failure"""
-        test_name = test_result["test_name"]
-        template = self.fix_templates.get(test_name, "Fix {test_name} issue")
-        
-        # Create a safe copy of test_result with default values for missing keys
-        safe_test_result = test_result.copy()
-        safe_test_result.setdefault("element", "element")
-        safe_test_result.setdefault("url", "link")
-        safe_test_result.setdefault("missing_field", "field")
-        safe_test_result.setdefault("expected_font", "Arial")
-        safe_test_result.setdefault("expected_color", "#0085FF")
-        safe_test_result.setdefault("spacing_rule", "padding")
-        safe_test_result.setdefault("expected_logo", "logo")
-        safe_test_result.setdefault("spam_text", "text")
-        safe_test_result.setdefault("grammar_issue", "issue")
-        safe_test_result.setdefault("current_text", "text")
+        test_name = test_result.rule
+        render = self._compiled_templates.get(test_name, self._default_deterministic_template)
         
         return {
             "type": "deterministic",
             "issue": test_name,
-            "description": test_result["details"],
-            "suggestion": template.format(**safe_test_result),
+            "description": test_result.description,
+            "suggestion": render(test_result.source),
             "priority": "high"
         }
     
-    def _generate_compliance_fix(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_compliance_fix(self, issue: Issue) -> Dict[str, Any]:
         """Generate fix for compliance issue"""
-        rule = issue.get("rule", "compliance")
-        template = self.fix_templates.get(rule, "Fix compliance issue: {description}")
-        
-        # Create a safe copy of issue with default values for missing keys
-        safe_issue = issue.copy()
-        safe_issue.setdefault("element", "element")
-        safe_issue.setdefault("url", "link")
-        safe_issue.setdefault("missing_field", "field")
-        safe_issue.setdefault("expected_font", "Arial")
-        safe_issue.setdefault("expected_color", "#0085FF")
-        safe_issue.setdefault("spacing_rule", "padding")
-        safe_issue.setdefault("expected_logo", "logo")
-        safe_issue.setdefault("spam_text", "text")
-        safe_issue.setdefault("grammar_issue", "issue")
-        safe_issue.setdefault("current_text", "text")
-        safe_issue.setdefault("description", "issue")
+        rule = issue.rule or "compliance"
+        render = self._compiled_templates.get(rule, self._default_compliance_template)
         
         return {
             "type": "compliance",
             "issue": rule,
-            "description": issue.get("description", ""),
-            "suggestion": template.format(**safe_issue),
-            "priority": issue.get("severity", "medium")
+            "description": issue.description,
+            "suggestion": render(issue.source),
+            "priority": issue.severity
         }
     
-    def _generate_tone_fix(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_tone_fix(self, issue: Issue) -> Dict[str, Any]:
         """Generate fix for tone issue"""
-        rule = issue.get("rule", "tone")
-        template = self.fix_templates.get(rule, "Improve tone/clarity: {description}")
-        
-        # Create a safe copy of issue with default values for missing keys
-        safe_issue = issue.copy()
-        safe_issue.setdefault("element", "element")
-        safe_issue.setdefault("url", "link")
-        safe_issue.setdefault("missing_field", "field")
-        safe_issue.setdefault("expected_font", "Arial")
-        safe_issue.setdefault("expected_color", "#0085FF")
-        safe_issue.setdefault("spacing_rule", "padding")
-        safe_issue.setdefault("expected_logo", "logo")
-        safe_issue.setdefault("spam_text", "text")
-        safe_issue.setdefault("grammar_issue", "issue")
-        safe_issue.setdefault("current_text", "text")
-        safe_issue.setdefault("description", "issue")
+        rule = issue.rule or "tone"
+        render = self._compiled_templates.get(rule, self._default_tone_template)
         
         return {
             "type": "tone",
             "issue": rule,
-            "description": issue.get("description", ""),
-            "suggestion": template.format(**safe_issue),
-            "priority": issue.get("severity", "medium")
+            "description": issue.description,
+            "suggestion": render(issue.source),
+            "priority": issue.severity
         }
     
-    def _generate_accessibility_fix(self, issue: Dict[str, Any]) -> Dict[str, Any]:
+    def _generate_accessibility_fix(self, issue: Issue) -> Dict[str, Any]:
         """Generate fix for accessibility issue"""
-        rule = issue.get("rule", "accessibility")
-        template = self.fix_templates.get(rule, "Improve accessibility: {description}")
-        
-        # Create a safe copy of issue with default values for missing keys
-        safe_issue = issue.copy()
-        safe_issue.setdefault("element", "element")
-        safe_issue.setdefault("url", "link")
-        safe_issue.setdefault("missing_field", "field")
-        safe_issue.setdefault("expected_font", "Arial")
-        safe_issue.setdefault("expected_color", "#0085FF")
-        safe_issue.setdefault("spacing_rule", "padding")
-        safe_issue.setdefault("expected_logo", "logo")
-        safe_issue.setdefault("spam_text", "text")
-        safe_issue.setdefault("grammar_issue", "issue")
-        safe_issue.setdefault("current_text", "text")
-        safe_issue.setdefault("description", "issue")
+        rule = issue.rule or "accessibility"
+        render = self._compiled_templates.get(rule, self._default_accessibility_template)
         
         return {
             "type": "accessibility",
             "issue": rule,
-            "description": issue.get("description", ""),
-            "suggestion": template.format(**safe_issue),
-            "priority": issue.get("severity", "medium")
+            "description": issue.description,
+            "suggestion": render(issue.source),
+            "priority": issue.severity
         }
     
-    def _prioritize_fixes(self, fixes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Prioritize fixes based on severity"""
-        priority_order = {"critical": 1, "high": 2, "medium": 3, "low": 4}
-        
-        # Sort fixes by priority
-        fixes.sort(key=lambda x: priority_order.get(x.get("priority", "medium"), 3))
-        
-        return fixes
\ No newline at end of file
+    def _prioritize_fixes_inplace(self, fixes: List[Dict[str, Any]]) -> None:
+        """Reorder fixes in place by priority, keeping their relative order within a priority"""
+        # Only a handful of priorities exist, so bucket the fixes in one stable pass
+        buckets = [[], [], [], [], []]
+        rank_get = _PRIORITY_RANK.get
+        for fix in fixes:
+            buckets[rank_get(fix.get("priority", "medium"), _DEFAULT_PRIORITY_RANK)].append(fix)
+        
+        fixes[:] = [fix for bucket in buckets for fix in bucket]
\ No newline at end of file
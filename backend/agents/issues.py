@@ -0,0 +1,78 @@
+"""
+Issue traversal helpers for the Email QA Agentic Platform
+Flattens the combined agent results so scoring, fixes and top issues share one walk
+"""
+
+from typing import Dict, Any, Iterator, List, NamedTuple
+import sys
+
+# Sub-agents whose results carry an "issues" list, in reporting order
+AGENT_CATEGORIES = ("compliance", "tone", "accessibility")
+
+
+class Issue(NamedTuple):
+    """
+    Flattened, immutable view of one failed test or agent issue
+    
+    The agent result dicts stay the JSON/storage format; this is the in-process
+    record the scoring, fix and ranking loops read by attribute.
+    """
+    category: str
+    rule: str
+    severity: str
+    description: str
+    source: Dict[str, Any]
+
+
+class IssueSummary(NamedTuple):
+    """Counts the overall-status decision needs, gathered from the walked issues"""
+    deterministic_failures: int
+    critical_compliance: bool
+
+
+def _intern(value: Any) -> Any:
+    """Intern strings (rule and severity names repeat across every email)"""
+    return sys.intern(value) if type(value) is str else value
+
+
+def walk_all_issues(all_agent_results: Dict[str, Any]) -> Iterator[Issue]:
+    """
+    Yield every reportable issue from the combined results
+    
+    Args:
+        all_agent_results: Combined results keyed by agent name plus "deterministic"
+        
+    Yields:
+        Issue records: failed deterministic tests first (as high severity), then each agent's issues
+    """
+    for test in all_agent_results.get("deterministic", []):
+        if test["status"] == "fail":
+            yield Issue("deterministic", _intern(test["test_name"]), "high", test["details"], test)
+    
+    for category in AGENT_CATEGORIES:
+        for issue in all_agent_results.get(category, {}).get("issues", []):
+            yield Issue(
+                category,
+                _intern(issue.get("rule", "")),
+                _intern(issue.get("severity", "medium")),
+                issue.get("description", ""),
+                issue
+            )
+
+
+def collect_all_issues(all_agent_results: Dict[str, Any]) -> List[Issue]:
+    """Materialize walk_all_issues once so several consumers can share it"""
+    return list(walk_all_issues(all_agent_results))
+
+
+def summarize_issues(issues: List[Issue]) -> IssueSummary:
+    """Count deterministic failures and detect critical compliance issues in one pass"""
+    deterministic_failures = 0
+    critical_compliance = False
+    for issue in issues:
+        category = issue.category
+        if category == "deterministic":
+            deterministic_failures += 1
+        elif category == "compliance" and issue.severity == "critical":
+            critical_compliance = True
+    return IssueSummary(deterministic_failures, critical_compliance)
@@ -3,125 +3,142 @@ Risk Scoring Agent for the Email QA Agentic Platform
 Calculates overall risk score based on all analysis results
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Mapping, Optional, Tuple
 from collections import Counter
+from functools import lru_cache
+from itertools import repeat
+from operator import mul
+from types import MappingProxyType
+from agents.issues import AGENT_CATEGORIES, Issue, collect_all_issues
 from database.models import RuleConfiguration
 from database.config import SessionLocal
 
 
+# Fallback rule weights used when the database cannot be read (read-only, shared)
+_DEFAULT_RULE_WEIGHTS = MappingProxyType({
+    "ALT Text Required": 10.0,
+    "Link Validation": 20.0,
+    "CTA Branding Color Check": 15.0,
+    "Template Width Check": 10.0,
+    "Font Size Check": 10.0,
+    "Copy Tone Check": 10.0,
+    "Accessibility Color Contrast": 10.0,
+    "Spam Word Check": 10.0,
+    "Decorative Image ALT Skip": 5.0
+})
+
+
+# Incremented on every invalidate_weights call
+_weights_generation = 0
+
+
+@lru_cache(maxsize=1)
+def _query_rule_weights() -> Dict[str, float]:
+    """Load rule weights from database once per process (failures are not cached)"""
+    db = SessionLocal()
+    try:
+        return {rule.name: rule.weight for rule in db.query(RuleConfiguration).all()}
+    finally:
+        db.close()
+
+
+def _load_rule_weights() -> Mapping[str, float]:
+    """Return the cached rule weights, falling back to defaults if the database is unavailable"""
+    try:
+        return _query_rule_weights()
+    except Exception as e:
+        print(f"Warning: Could not load rule weights from database: {e}")
+        # Return default weights
+        return _DEFAULT_RULE_WEIGHTS
+
+
+def invalidate_weights() -> None:
+    """Drop the cached rule weights so the next scoring run reloads them (call after rule edits)"""
+    global _weights_generation
+    _query_rule_weights.cache_clear()
+    _weights_generation += 1
+
+
+def weights_generation() -> int:
+    """Number of invalidations so far (lets QA worker processes detect stale weights)"""
+    return _weights_generation
+
+
+# Severity weights as a tuple indexed by severity slot (critical, high, medium, low)
+_SEV_IDX = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+_SEV_W = (10, 5, 3, 1)
+_MEDIUM_IDX = _SEV_IDX["medium"]  # Unknown severities are weighted as medium
+
+# Severity weights and risk thresholds by name (read-only, shared by all instances)
+_SEVERITY_WEIGHTS = MappingProxyType(dict(zip(_SEV_IDX, _SEV_W)))
+_RISK_THRESHOLDS = MappingProxyType({
+    "high": 80,
+    "medium": 50,
+    "low": 0
+})
+
+
 class RiskScoringAgent:
-    def __init__(self):
-        # Define severity weights
-        self.severity_weights = {
-            "critical": 10,
-            "high": 5,
-            "medium": 3,
-            "low": 1
-        }
-        
-        # Define risk thresholds
-        self.risk_thresholds = {
-            "high": 80,
-            "medium": 50,
-            "low": 0
-        }
-        
-        # Load rule configurations from database
-        self.rule_weights = self._load_rule_weights()
+    # Define severity weights and risk thresholds
+    severity_weights = _SEVERITY_WEIGHTS
+    risk_thresholds = _RISK_THRESHOLDS
     
-    def _load_rule_weights(self) -> Dict[str, float]:
-        """Load rule weights from database"""
-        try:
-            db = SessionLocal()
-            rules = db.query(RuleConfiguration).all()
-            weights = {}
-            for rule in rules:
-                weights[rule.name] = rule.weight
-            db.close()
-            return weights
-        except Exception as e:
-            print(f"Warning: Could not load rule weights from database: {e}")
-            # Return default weights
-            return {
-                "ALT Text Required": 10.0,
-                "Link Validation": 20.0,
-                "CTA Branding Color Check": 15.0,
-                "Template Width Check": 10.0,
-                "Font Size Check": 10.0,
-                "Copy Tone Check": 10.0,
-                "Accessibility Color Contrast": 10.0,
-                "Spam Word Check": 10.0,
-                "Decorative Image ALT Skip": 5.0
-            }
+    @property
+    def rule_weights(self) -> Mapping[str, float]:
+        """Rule weights from the database, loaded once per process and shared by all instances"""
+        return _load_rule_weights()
     
-    def calculate_risk(self, all_agent_results: Dict[str, Any]) -> Dict[str, Any]:
+    def calculate_risk(self, all_agent_results: Dict[str, Any],
+                       issues: Optional[List[Issue]] = None) -> Dict[str, Any]:
         """
         Calculate risk score based on all agent results
         
         Args:
             all_agent_results: Combined results from all agents
+            issues: Pre-walked Issue list of all_agent_results, walked here if omitted
             
         Returns:
             Dict containing risk score and level
         """
+        # Resolve the (cached) rule weights once for this run
+        rule_weights = self.rule_weights
+        deterministic_results = all_agent_results.get("deterministic", [])
+        if issues is None:
+            issues = collect_all_issues(all_agent_results)
+        
+        # Nothing failed and no agent reported anything: only the deterministic max is non-zero
+        if not issues:
+            return self._no_issue_result(deterministic_results, rule_weights)
+        
         # Calculate base score from all issues
         total_score = 0
         max_possible_score = 100
-        issue_counts = Counter()
+        severities: List[str] = []
         
-        # Process deterministic test results
-        deterministic_results = all_agent_results.get("deterministic", [])
+        # Process deterministic test results (every test counts towards the max, failures score)
         deterministic_score = 0
         deterministic_max = 0
+        deterministic_failures = 0
+        high_weight = _SEV_W[_SEV_IDX["high"]]  # Deterministic failures are generally high severity
+        weight_get = rule_weights.get
         
         for test in deterministic_results:
+            weight = weight_get(test.get("test_name", ""), 5.0) / 100  # Default weight
             if test["status"] == "fail":
-                # Get weight for this test
-                test_name = test.get("test_name", "")
-                weight = self.rule_weights.get(test_name, 5.0)  # Default weight
-                severity = "high"  # Deterministic failures are generally high severity
-                deterministic_score += (weight / 100) * self.severity_weights.get(severity, 5)
-                issue_counts[severity] += 1
-            deterministic_max += self.rule_weights.get(test.get("test_name", ""), 5.0) / 100 * self.severity_weights["high"]
-        
-        # Process compliance results
-        compliance_results = all_agent_results.get("compliance", {})
-        compliance_score = 0
-        compliance_max = 0
-        
-        for issue in compliance_results.get("issues", []):
-            rule_name = issue.get("rule", "")
-            weight = self.rule_weights.get(rule_name, 10.0)  # Default weight
-            severity = issue.get("severity", "medium")
-            compliance_score += (weight / 100) * self.severity_weights.get(severity, 3)
-            issue_counts[severity] += 1
-            compliance_max += self.rule_weights.get(rule_name, 10.0) / 100 * self.severity_weights["critical"]
-        
-        # Process tone results
-        tone_results = all_agent_results.get("tone", {})
-        tone_score = 0
-        tone_max = 0
-        
-        for issue in tone_results.get("issues", []):
-            rule_name = issue.get("rule", "")
-            weight = self.rule_weights.get(rule_name, 10.0)  # Default weight
-            severity = issue.get("severity", "medium")
-            tone_score += (weight / 100) * self.severity_weights.get(severity, 3)
-            issue_counts[severity] += 1
-            tone_max += self.rule_weights.get(rule_name, 10.0) / 100 * self.severity_weights["critical"]
-        
-        # Process accessibility results
-        accessibility_results = all_agent_results.get("accessibility", {})
-        accessibility_score = 0
-        accessibility_max = 0
-        
-        for issue in accessibility_results.get("issues", []):
-            rule_name = issue.get("rule", "")
-            weight = self.rule_weights.get(rule_name, 10.0)  # Default weight
-            severity = issue.get("severity", "medium")
-            accessibility_score += (weight / 100) * self.severity_weights.get(severity, 3)
-            issue_counts[severity] += 1
-            accessibility_max += self.rule_weights.get(rule_name, 10.0) / 100 * self.severity_weights["critical"]
+                deterministic_score += weight * high_weight
+                deterministic_failures += 1
+            deterministic_max += weight * high_weight
+        
+        severities.extend(["high"] * deterministic_failures)
+        
+        # Process compliance, tone and accessibility results in one walk
+        agent_scores = self._accumulate(issues, rule_weights, severities)
+        compliance_score, compliance_max = agent_scores["compliance"]
+        tone_score, tone_max = agent_scores["tone"]
+        accessibility_score, accessibility_max = agent_scores["accessibility"]
+        
+        # Count severities in one C-level pass
+        issue_counts = Counter(severities)
         
         # Calculate weighted scores (40% deterministic, 25% compliance, 15% tone, 20% accessibility)
         deterministic_weighted = (deterministic_score / max(deterministic_max, 1)) * 40 if deterministic_max > 0 else 0
@@ -170,6 +187,70 @@ class RiskScoringAgent:
             "reason": self._generate_risk_reason(risk_level, issue_counts)
         }
     
+    def _no_issue_result(self, deterministic_results: List[Dict[str, Any]],
+                         rule_weights: Mapping[str, float]) -> Dict[str, Any]:
+        """Build the zero-score result for an email with no failures or issues"""
+        high_weight = _SEV_W[_SEV_IDX["high"]]
+        deterministic_max = sum(
+            rule_weights.get(test.get("test_name", ""), 5.0) / 100 * high_weight
+            for test in deterministic_results
+        )
+        
+        return {
+            "agent": "risk_scoring",
+            "score": 0,
+            "risk_level": "low",
+            "issue_counts": {},
+            "breakdown": {
+                "deterministic": {
+                    "score": 0.0 if deterministic_max > 0 else 0,
+                    "max": 40,
+                    "raw_score": 0,
+                    "raw_max": round(deterministic_max, 2)
+                },
+                "compliance": {"score": 0, "max": 25, "raw_score": 0, "raw_max": 0},
+                "tone": {"score": 0, "max": 15, "raw_score": 0, "raw_max": 0},
+                "accessibility": {"score": 0, "max": 20, "raw_score": 0, "raw_max": 0}
+            },
+            "reason": "Low risk with 0 minor issues"
+        }
+    
+    def _accumulate(self, issues: List[Issue], rule_weights: Mapping[str, float],
+                    severities: List[str]) -> Dict[str, Tuple[float, float]]:
+        """
+        Sum the weighted severity score of agent issues in one pass, collecting their severities
+        
+        Deterministic entries are skipped; they are scored from the full test list.
+        
+        Returns:
+            Dict mapping agent category to (score, max score if every issue were critical)
+        """
+        # Stage per-category rule and severity weights, then reduce each category in C
+        weights: Dict[str, List[float]] = {category: [] for category in AGENT_CATEGORIES}
+        severity_weights: Dict[str, List[int]] = {category: [] for category in AGENT_CATEGORIES}
+        weight_get = rule_weights.get
+        severity_index = _SEV_IDX.get
+        critical_weight = _SEV_W[_SEV_IDX["critical"]]
+        add_severity = severities.append
+        
+        for issue in issues:
+            category = issue.category
+            if category not in weights:
+                continue
+            severity = issue.severity
+            weights[category].append(weight_get(issue.rule, 10.0) / 100)  # Default weight
+            severity_weights[category].append(_SEV_W[severity_index(severity, _MEDIUM_IDX)])
+            add_severity(severity)
+        
+        # Same left-to-right float sums as an accumulating loop, so scores are unchanged
+        return {
+            category: (
+                sum(map(mul, weights[category], severity_weights[category])),
+                sum(map(mul, weights[category], repeat(critical_weight)))
+            )
+            for category in AGENT_CATEGORIES
+        }
+    
     def _determine_risk_level(self, score: float) -> str:
         """Determine risk level based on score"""
         if score >= self.risk_thresholds["high"]:
@@ -3,25 +3,55 @@ Supervisor Agent for the Email QA Agentic Platform
 Controls orchestration and merges results from sub-agents
 """
 
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from operator import itemgetter
+import heapq
+import threading
 from agents.compliance_agent import ComplianceAgent
 from agents.tone_agent import ToneAgent
 from agents.accessibility_agent import AccessibilityAgent
 from agents.risk_scoring_agent import RiskScoringAgent
 from agents.fix_suggestion_agent import FixSuggestionAgent
+from agents.issues import Issue, IssueSummary, collect_all_issues, summarize_issues
+
+# Sort rank of each issue severity for top-issue selection (unknown severities rank lowest)
+_SEVERITY_RANK = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+
+# Pool for running the independent sub-agent analyses of one email side by side
+_EXECUTOR = ThreadPoolExecutor(max_workers=3, thread_name_prefix="supervisor")
 
 
 class SupervisorAgent:
+    # Sub-agents hold no per-email state, so one set is built lazily and shared by all supervisors
+    _shared_agents: Optional[Tuple[ComplianceAgent, ToneAgent, AccessibilityAgent,
+                                   RiskScoringAgent, FixSuggestionAgent]] = None
+    _shared_agents_lock = threading.Lock()
+    
     def __init__(self):
-        # Initialize all sub-agents
-        self.compliance_agent = ComplianceAgent()
-        self.tone_agent = ToneAgent()
-        self.accessibility_agent = AccessibilityAgent()
-        self.risk_scoring_agent = RiskScoringAgent()
-        self.fix_suggestion_agent = FixSuggestionAgent()
+        # Reuse the process-wide sub-agents
+        (self.compliance_agent, self.tone_agent, self.accessibility_agent,
+         self.risk_scoring_agent, self.fix_suggestion_agent) = self._get_shared_agents()
+    
+    @classmethod
+    def _get_shared_agents(cls) -> Tuple[ComplianceAgent, ToneAgent, AccessibilityAgent,
+                                         RiskScoringAgent, FixSuggestionAgent]:
+        """Construct the sub-agents on first use, once per process"""
+        agents = cls._shared_agents
+        if agents is None:
+            with cls._shared_agents_lock:
+                agents = cls._shared_agents
+                if agents is None:
+                    agents = (ComplianceAgent(), ToneAgent(), AccessibilityAgent(),
+                              RiskScoringAgent(), FixSuggestionAgent())
+                    cls._shared_agents = agents
+        return agents
     
     def process_email(self, email_id: str, html_content: str, metadata: Dict[str, Any], 
-                     deterministic_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+                     deterministic_results: List[Dict[str, Any]],
+                     parsed_tree: Optional[Any] = None,
+                     element_index: Optional[Dict[str, List[Any]]] = None) -> Dict[str, Any]:
         """
         Process an email through all sub-agents and consolidate results
         
@@ -30,14 +60,59 @@ class SupervisorAgent:
             html_content: HTML content of the email
             metadata: Metadata associated with the email
             deterministic_results: Results from deterministic tests
+            parsed_tree: Pre-parsed lxml tree of html_content shared with the agents
+            element_index: Per-tag element index of parsed_tree shared with the agents
+            
+        Returns:
+            Dict containing the consolidated analysis from all agents
+        """
+        # Run each agent's analysis concurrently; scoring and fixes need all of them
+        agent_futures = {
+            name: _EXECUTOR.submit(task)
+            for name, task in self.analysis_tasks(
+                email_id, html_content, metadata, parsed_tree, element_index
+            ).items()
+        }
+        agent_results = {name: future.result() for name, future in agent_futures.items()}
+        
+        return self.consolidate_results(agent_results, deterministic_results)
+    
+    def analysis_tasks(self, email_id: str, html_content: str, metadata: Dict[str, Any],
+                       parsed_tree: Optional[Any] = None,
+                       element_index: Optional[Dict[str, List[Any]]] = None
+                       ) -> Dict[str, Callable[[], Dict[str, Any]]]:
+        """
+        Build the independent sub-agent analyses for an email
+        
+        The tasks share no mutable state, so callers may run them concurrently.
+        
+        Returns:
+            Dict mapping agent name to a zero-argument callable returning its results
+        """
+        return {
+            "compliance": partial(self.compliance_agent.analyze, email_id, html_content, metadata),
+            "tone": partial(self.tone_agent.analyze, email_id, html_content, metadata),
+            "accessibility": partial(
+                self.accessibility_agent.analyze, email_id, html_content, metadata,
+                parsed_tree=parsed_tree, element_index=element_index
+            ),
+        }
+    
+    def consolidate_results(self, agent_results: Dict[str, Dict[str, Any]],
+                            deterministic_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Score and merge sub-agent results into the consolidated analysis
+        
+        Args:
+            agent_results: Results keyed by agent name, as produced by analysis_tasks
+            deterministic_results: Results from deterministic tests
             
         Returns:
             Dict containing the consolidated analysis from all agents
         """
-        # Run each agent's analysis
-        compliance_results = self.compliance_agent.analyze(email_id, html_content, metadata)
-        tone_results = self.tone_agent.analyze(email_id, html_content, metadata)
-        accessibility_results = self.accessibility_agent.analyze(email_id, html_content, metadata)
+        compliance_results = agent_results["compliance"]
+        tone_results = agent_results["tone"]
+        accessibility_results = agent_results["accessibility"]
         
         # Combine all agent results for risk scoring
         all_agent_results = {
@@ -47,19 +122,19 @@ class SupervisorAgent:
             "deterministic": deterministic_results
         }
         
+        # Walk every issue once; scoring, fixes and top issues all consume the same list
+        issues = collect_all_issues(all_agent_results)
+        
         # Calculate risk score
-        risk_results = self.risk_scoring_agent.calculate_risk(all_agent_results)
+        risk_results = self.risk_scoring_agent.calculate_risk(all_agent_results, issues)
         
         # Generate fix suggestions
-        fix_suggestions = self.fix_suggestion_agent.generate_fixes(
-            all_agent_results, risk_results
-        )
+        fix_suggestions = self.fix_suggestion_agent.generate_fixes(all_agent_results, issues)
         
         # Consolidate all results
         consolidated_results = {
             "overall_status": self._determine_overall_status(
-                deterministic_results, compliance_results, tone_results, 
-                accessibility_results, risk_results
+                summarize_issues(issues), risk_results.get("risk_level", "low")
             ),
             "risk_score": risk_results.get("score", 0),
             "risk_level": risk_results.get("risk_level", "low"),
@@ -68,82 +143,41 @@ class SupervisorAgent:
             "accessibility_analysis": accessibility_results,
             "deterministic_results": deterministic_results,
             "fix_suggestions": fix_suggestions,
-            "top_issues": self._extract_top_issues(
-                deterministic_results, compliance_results, tone_results,
-                accessibility_results
-            ),
+            "top_issues": self._extract_top_issues(issues),
             "score_breakdown": risk_results.get("breakdown", {})
         }
         
         return consolidated_results
     
-    def _determine_overall_status(self, deterministic_results: List[Dict], 
-                                 compliance_results: Dict, tone_results: Dict,
-                                 accessibility_results: Dict, risk_results: Dict) -> str:
-        """Determine overall status based on all analysis results"""
-        # Count deterministic failures
-        deterministic_failures = sum(1 for test in deterministic_results if test["status"] == "fail")
-        
-        # Check for critical compliance issues
-        compliance_issues = compliance_results.get("issues", [])
-        critical_compliance = any(issue.get("severity") == "critical" for issue in compliance_issues)
+    def _determine_overall_status(self, summary: IssueSummary, risk_level: str) -> str:
+        """Determine overall status from the issue summary and risk level"""
+        deterministic_failures, critical_compliance = summary
         
-        # Check risk level
-        risk_level = risk_results.get("risk_level", "low")
+        # Most emails pass: no failures, no critical compliance issue, low risk
+        if (not deterministic_failures and not critical_compliance
+                and risk_level != "high" and risk_level != "medium"):
+            return "pass"
         
         # Determine overall status
         if deterministic_failures > 3 or critical_compliance or risk_level == "high":
             return "fail"
-        elif deterministic_failures > 0 or risk_level == "medium":
-            return "needs_review"
         else:
-            return "pass"
+            return "needs_review"
     
-    def _extract_top_issues(self, deterministic_results: List[Dict], 
-                           compliance_results: Dict, tone_results: Dict,
-                           accessibility_results: Dict) -> List[Dict[str, Any]]:
-        """Extract top issues from all analyses"""
-        top_issues = []
-        
-        # Add deterministic failures
-        for test in deterministic_results:
-            if test["status"] == "fail":
-                top_issues.append({
-                    "type": "deterministic",
-                    "test_name": test["test_name"],
-                    "details": test["details"],
-                    "severity": "high"
-                })
-        
-        # Add compliance issues
-        for issue in compliance_results.get("issues", []):
-            top_issues.append({
-                "type": "compliance",
-                "test_name": issue.get("rule", ""),
-                "details": issue.get("description", ""),
-                "severity": issue.get("severity", "medium")
-            })
-        
-        # Add tone issues
-        for issue in tone_results.get("issues", []):
-            top_issues.append({
-                "type": "tone",
-                "test_name": issue.get("rule", ""),
-                "details": issue.get("description", ""),
-                "severity": issue.get("severity", "medium")
-            })
-        
-        # Add accessibility issues
-        for issue in accessibility_results.get("issues", []):
-            top_issues.append({
-                "type": "accessibility",
-                "test_name": issue.get("rule", ""),
-                "details": issue.get("description", ""),
-                "severity": issue.get("severity", "medium")
-            })
+    def _extract_top_issues(self, issues: List[Issue]) -> List[Dict[str, Any]]:
+        """Extract top issues from the walked Issue list"""
+        # (severity rank, issue) pairs, ranked as each issue is built
+        ranked = []
+        rank_get = _SEVERITY_RANK.get
         
-        # Sort by severity (critical > high > medium > low)
-        severity_order = {"critical": 4, "high": 3, "medium": 2, "low": 1}
-        top_issues.sort(key=lambda x: severity_order.get(x["severity"], 0), reverse=True)
+        for issue in issues:
+            # Deterministic failures are walked as high severity, so one shape covers every category
+            ranked.append((rank_get(issue.severity, 0), {
+                "type": issue.category,
+                "test_name": issue.rule,
+                "details": issue.description,
+                "severity": issue.severity
+            }))
         
-        return top_issues[:10]  # Return top 10 issues
\ No newline at end of file
+        # Select the 10 most severe (critical > high > medium > low), stable like a sort + slice
+        return [issue for _, issue in heapq.nlargest(10, ranked, key=itemgetter(0))]
\ No newline at end of file
@@ -3,11 +3,32 @@ Tone Agent for the Email QA Agentic Platform
 Checks copy clarity, tone, grammar, and spam indicators
 """
 
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Set, Tuple
+import ahocorasick
 import re
 
+from result_cache import ResultCache, content_digest
+
+
+# Patterns used on every email, compiled once
+_TAG_RE = re.compile(r'<[^<]+?>')
+_SENT_RE = re.compile(r'[.!?]+')
+# Passive voice markers: words ending in 'ed', 'been' and 'being' verbs (one scan)
+_PASSIVE_RE = re.compile(r'\b(?:\w+ed|been|being)\b', re.IGNORECASE)
+_PASSIVE_LIMIT = 10
+# Shortest text that can exceed the limit: each marker has 3+ word characters and a separator
+_PASSIVE_MIN_CHARS = (_PASSIVE_LIMIT + 1) * 4 - 1
+# Distinct connectors a sentence may contain before it is flagged as complex
+_COMPLEX_LIMIT = 2
+_REPEAT_RE = re.compile(r'\b(\w+)\s+\1\b', re.IGNORECASE)
+# Distinct repeated words reported before the scan stops
+_REPEAT_LIMIT = 50
+
 
 class ToneAgent:
+    # Issues per (HTML digest, subject), shared by every instance
+    _issue_cache = ResultCache(maxsize=1024)
+    
     def __init__(self):
         # Define spam keywords and phrases
         self.spam_keywords = [
@@ -20,6 +41,36 @@ class ToneAgent:
             "however", "nevertheless", "moreover", "furthermore", "consequently",
             "therefore", "thus", "hence", "accordingly", "notwithstanding"
         ]
+        
+        # Match each keyword list in a single pass per string
+        self._spam_automaton = self._build_automaton(self.spam_keywords)
+        self._complex_automaton = self._build_automaton(self.complex_sentence_indicators)
+        
+        # A complex sentence is at least as long as the shortest indicator that can be its
+        # (_COMPLEX_LIMIT + 1)th distinct match (indicators may overlap, so lengths don't add up)
+        indicator_lengths = sorted(len(indicator) for indicator in set(self.complex_sentence_indicators))
+        if len(indicator_lengths) > _COMPLEX_LIMIT:
+            self._complex_min_chars = indicator_lengths[_COMPLEX_LIMIT]
+        else:
+            self._complex_min_chars = None
+    
+    def _build_automaton(self, phrases: Iterable[str]) -> ahocorasick.Automaton:
+        """Build an Aho-Corasick automaton matching phrases against lowercased text"""
+        automaton = ahocorasick.Automaton()
+        for phrase in phrases:
+            automaton.add_word(phrase.lower(), phrase)
+        if len(automaton):
+            automaton.make_automaton()
+        return automaton
+    
+    def _find_phrases(self, automaton: ahocorasick.Automaton, text_lower: str,
+                      start: int = 0, end: Optional[int] = None) -> Set[str]:
+        """Return the distinct phrases of the automaton occurring in text_lower[start:end]"""
+        if not len(automaton):
+            return set()
+        if end is None:
+            end = len(text_lower)
+        return {phrase for _, phrase in automaton.iter(text_lower, start, end)}
     
     def analyze(self, email_id: str, html_content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -33,52 +84,73 @@ class ToneAgent:
         Returns:
             Dict containing tone analysis results
         """
+        subject = metadata.get("subject", "")
+        
+        # Identical content and subject always yield the same issues
+        cache_key = (content_digest(html_content), subject)
+        cached_issues = self._issue_cache.get(cache_key)
+        if cached_issues is None:
+            cached_issues = tuple(self._analyze_issues(html_content, subject))
+            self._issue_cache.put(cache_key, cached_issues)
+        issues = [dict(issue) for issue in cached_issues]
+        
+        return {
+            "agent": "tone",
+            "email_id": email_id,
+            "issues": issues,
+            "summary": f"Found {len(issues)} tone/clarity issues"
+        }
+    
+    def _analyze_issues(self, html_content: str, subject: str) -> List[Dict[str, str]]:
+        """Run every tone check on the email body and subject"""
         issues = []
         
         # Extract text content from HTML
         text_content = self._extract_text_content(html_content)
         
         # Check subject line for spam indicators
-        subject = metadata.get("subject", "")
         subject_spam_issues = self._check_subject_for_spam(subject)
         issues.extend(subject_spam_issues)
         
+        # Skip body checks whose thresholds text this short cannot reach
+        text_length = len(text_content)
+        
         # Check for complex sentences
-        complex_sentence_issues = self._check_complex_sentences(text_content)
-        issues.extend(complex_sentence_issues)
+        if self._complex_min_chars is not None and text_length >= self._complex_min_chars:
+            complex_sentence_issues = self._check_complex_sentences(text_content)
+            issues.extend(complex_sentence_issues)
         
         # Check for clarity issues
-        clarity_issues = self._check_clarity(text_content)
-        issues.extend(clarity_issues)
+        if text_length >= _PASSIVE_MIN_CHARS:
+            clarity_issues = self._check_clarity(text_content)
+            issues.extend(clarity_issues)
         
         # Check for grammar issues (simplified)
         grammar_issues = self._check_grammar(text_content)
         issues.extend(grammar_issues)
         
-        return {
-            "agent": "tone",
-            "email_id": email_id,
-            "issues": issues,
-            "summary": f"Found {len(issues)} tone/clarity issues"
-        }
+        return issues
     
     def _extract_text_content(self, html_content: str) -> str:
         """Extract text content from HTML"""
-        # Remove HTML tags
-        clean_text = re.sub('<[^<]+?>', '', html_content)
-        # Remove extra whitespace
-        clean_text = re.sub('\s+', ' ', clean_text).strip()
-        return clean_text
+        # Remove HTML tags, then collapse whitespace runs in the same C-level
+        # split/join (str.split treats exactly the characters '\s' matches as whitespace)
+        return ' '.join(_TAG_RE.sub('', html_content).split())
     
     def _check_subject_for_spam(self, subject: str) -> list:
         """Check subject line for spam indicators"""
         issues = []
         
-        # Convert to lowercase for comparison
+        # Nothing to flag on an empty subject
+        if not subject:
+            return issues
+        
+        # Convert to lowercase once for comparison
         subject_lower = subject.lower()
         
         # Check for spam keywords
-        found_spam_keywords = [keyword for keyword in self.spam_keywords if keyword in subject_lower]
+        found = self._find_phrases(self._spam_automaton, subject_lower)
+        found_spam_keywords = [keyword for keyword in self.spam_keywords if keyword in found]
         
         if found_spam_keywords:
             issues.append({
@@ -95,8 +167,8 @@ class ToneAgent:
                 "severity": "medium"
             })
         
-        # Check for all caps
-        if subject.isupper() and len(subject) > 10:
+        # Check for all caps (length first so short subjects skip the scan)
+        if len(subject) > 10 and subject.isupper():
             issues.append({
                 "rule": "spam_indicators",
                 "description": "Subject line is all caps",
@@ -109,15 +181,20 @@ class ToneAgent:
         """Check for overly complex sentences"""
         issues = []
         
-        # Split text into sentences
-        sentences = re.split(r'[.!?]+', text_content)
+        # Lowercase the document once and scan each sentence span in place; lowercasing
+        # can change the length of a few characters (e.g. 'İ'), which would misalign spans
+        text_lower = text_content.lower()
+        aligned = len(text_lower) == len(text_content)
         
         # Check for sentences with too many complex indicators
-        for sentence in sentences:
-            complex_count = sum(1 for indicator in self.complex_sentence_indicators 
-                              if indicator in sentence.lower())
+        for start, end in self._sentence_spans(text_content):
+            if aligned:
+                found = self._find_phrases(self._complex_automaton, text_lower, start, end)
+            else:
+                found = self._find_phrases(self._complex_automaton, text_content[start:end].lower())
             
-            if complex_count > 2:
+            if len(found) > _COMPLEX_LIMIT:
+                sentence = text_content[start:end]
                 issues.append({
                     "rule": "complex_sentences",
                     "description": f"Sentence contains too many complex connectors: {sentence[:50]}...",
@@ -126,23 +203,28 @@ class ToneAgent:
         
         return issues
     
+    def _sentence_spans(self, text_content: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) of the same segments as _SENT_RE.split without building the list"""
+        start = 0
+        for boundary in _SENT_RE.finditer(text_content):
+            yield start, boundary.start()
+            start = boundary.end()
+        yield start, len(text_content)
+    
     def _check_clarity(self, text_content: str) -> list:
         """Check for clarity issues"""
         issues = []
         
         # Check for passive voice (simplified detection)
-        passive_voice_patterns = [
-            r'\b\w+ed\b',  # Words ending in 'ed'
-            r'\bbeen\b',   # 'been' verb
-            r'\bbeing\b'   # 'being' verb
-        ]
-        
+        # Only whether the limit is exceeded matters, so stop scanning once it is
         passive_count = 0
-        for pattern in passive_voice_patterns:
-            passive_count += len(re.findall(pattern, text_content, re.IGNORECASE))
+        for _ in _PASSIVE_RE.finditer(text_content):
+            passive_count += 1
+            if passive_count > _PASSIVE_LIMIT:
+                break
         
         # If too many passive constructions
-        if passive_count > 10:
+        if passive_count > _PASSIVE_LIMIT:
             issues.append({
                 "rule": "clarity",
                 "description": "Text contains excessive passive voice constructions",
@@ -155,13 +237,17 @@ class ToneAgent:
         """Check for basic grammar issues (simplified)"""
         issues = []
         
-        # Check for repeated words
-        repeated_words = re.findall(r'\b(\w+)\s+\1\b', text_content, re.IGNORECASE)
+        # Check for repeated words (distinct, in order of first occurrence)
+        repeated_words = {}
+        for match in _REPEAT_RE.finditer(text_content):
+            repeated_words[match.group(1)] = None
+            if len(repeated_words) >= _REPEAT_LIMIT:
+                break
         
         if repeated_words:
             issues.append({
                 "rule": "grammar",
-                "description": f"Repeated words found: {', '.join(set(repeated_words))}",
+                "description": f"Repeated words found: {', '.join(repeated_words)}",
                 "severity": "low"
             })
         
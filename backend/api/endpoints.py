@@ -3,17 +3,27 @@ API Endpoints for the Email QA Agentic Platform
 """
 
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends, Body
-from fastapi.responses import HTMLResponse
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
+from fastapi.concurrency import run_in_threadpool
+from concurrent.futures import ProcessPoolExecutor
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Set, Tuple, Union
+from pydantic import BaseModel, ConfigDict, TypeAdapter, field_validator
+from datetime import datetime
+import asyncio
+import codecs
+import multiprocessing
 import os
-import uuid
-import json
+import orjson
 from connectors.email_on_acid import EmailOnAcidConnector
-from agent_orchestrator import AgentOrchestrator
-from database.config import get_db
-from database.models import EmailTemplate, QAReport, UploadRecord, RuleConfiguration
-from sqlalchemy.orm import Session
+from agent_orchestrator import AgentOrchestrator, run_qa_in_worker
+from agents.risk_scoring_agent import invalidate_weights, weights_generation
+from database.config import AsyncSessionLocal, IS_POSTGRES, get_db
+from database.models import EmailTemplate, QAJob, QAReport, UploadRecord, RuleConfiguration
+from database.ids import uuid7
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 # Initialize router
 router = APIRouter()
@@ -27,6 +37,72 @@ except Exception as e:
     email_connector = None
     agent_orchestrator = None
 
+# Dialects supporting INSERT ... ON CONFLICT DO UPDATE
+_UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
+# Columns refreshed when a QA report is re-run
+_QA_REPORT_UPDATE_COLUMNS = ("overall_status", "risk_score", "report_data")
+
+# In-flight work keyed by (operation, email_id); concurrent callers share one run
+_inflight: Dict[Tuple[str, str], "asyncio.Future[Any]"] = {}
+
+# Bytes read from an upload per chunk while decoding it
+_UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Background QA jobs queued on this process at once; further submissions get a 503
+_QA_MAX_PENDING_JOBS = int(os.getenv("QA_MAX_PENDING_JOBS", "1024"))
+# Strong references to running job tasks so they are not garbage collected mid-run
+_qa_job_tasks: Set["asyncio.Task[None]"] = set()
+# Jobs accepted but not yet finished (counted before the job row is written)
+_qa_jobs_pending = 0
+
+# Worker processes running QA analyses in parallel (0 runs them on this process's threadpool)
+_QA_WORKER_PROCESSES = int(os.getenv("QA_WORKER_PROCESSES", str(os.cpu_count() or 1)))
+# QA runs (uploads, /qa and jobs) allowed in flight at once; the rest wait for a slot
+_QA_MAX_CONCURRENT = int(os.getenv("QA_MAX_CONCURRENT", str(max(_QA_WORKER_PROCESSES, 1) * 2)))
+
+# Created on first use: the pool spawns its workers lazily, and the semaphore must be
+# made inside the running event loop on Python 3.9
+_qa_pool: Optional[ProcessPoolExecutor] = None
+_qa_slots: Optional[asyncio.Semaphore] = None
+
+
+async def _singleflight(key: Tuple[str, str], func: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+    """Await func(*args), or the identical call already running under key"""
+    future = _inflight.get(key)
+    while future is not None:
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                # This caller itself was cancelled
+                raise
+        # The leader was cancelled (e.g. its client disconnected): run the call afresh,
+        # or join whichever waiter already took over
+        future = _inflight.get(key)
+    
+    # Check-and-insert happens without an await in between, so no lock is needed
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await func(*args)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as exc:
+        future.set_exception(exc)
+        # Mark the exception retrieved in case nobody else was waiting
+        future.exception()
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        _inflight.pop(key, None)
+
 
 class QARequest(BaseModel):
     email_id: str
@@ -48,6 +124,9 @@ class RuleConfigRequest(BaseModel):
 
 
 class RuleConfigResponse(BaseModel):
+    # Built straight from RuleConfiguration rows
+    model_config = ConfigDict(from_attributes=True)
+    
     id: str
     name: str
     description: str
@@ -59,185 +138,404 @@ class RuleConfigResponse(BaseModel):
     category: str
     created_at: str
     updated_at: str
+    
+    @field_validator("business_override_text", "error_message", mode="before")
+    @classmethod
+    def _empty_if_none(cls, value: Optional[str]) -> str:
+        return value or ""
+    
+    @field_validator("created_at", "updated_at", mode="before")
+    @classmethod
+    def _isoformat(cls, value: Union[datetime, str, None]) -> str:
+        # Strings (e.g. already-serialized timestamps) pass through unchanged
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value or ""
+
+
+# Validates a list of rows into RuleConfigResponse models in one call
+_RULE_LIST_ADAPTER = TypeAdapter(List[RuleConfigResponse])
+
+
+def _rule_response(rule: RuleConfiguration) -> ORJSONResponse:
+    """Serialize one rule (returning a Response skips FastAPI's response_model revalidation)"""
+    return ORJSONResponse(RuleConfigResponse.model_validate(rule).model_dump(mode="json"))
+
+
+def _rules_response(rules: List[RuleConfiguration]) -> ORJSONResponse:
+    """Serialize a list of rules in one validate/dump pass"""
+    models = _RULE_LIST_ADAPTER.validate_python(rules, from_attributes=True)
+    return ORJSONResponse(_RULE_LIST_ADAPTER.dump_python(models, mode="json"))
 
 
 # GET /emails - list of proofs from Email on Acid
-@router.get("/emails", response_model=List[Dict[str, Any]])
-async def get_emails(db: Session = Depends(get_db)):
+# Plain-dict endpoints return ORJSONResponse directly (response_model=None), skipping
+# FastAPI's jsonable_encoder/validation pass over data that has no schema to check
+@router.get("/emails", response_model=None)
+async def get_emails(db: AsyncSession = Depends(get_db)):
     """Fetch list of email proofs from Email on Acid and database"""
     if not email_connector:
         raise HTTPException(status_code=500, detail="Email connector not initialized")
     
     try:
-        # Get emails from database (uploaded files)
-        db_emails = db.query(EmailTemplate).all()
+        # Get emails from database (uploaded files) with their QA risk scores in one query,
+        # without loading the HTML bodies, while the Email on Acid list is fetched
+        db_result, eo_emails = await asyncio.gather(
+            db.execute(
+                select(
+                    EmailTemplate.id,
+                    EmailTemplate.name,
+                    EmailTemplate.created_at,
+                    EmailTemplate.status,
+                    EmailTemplate.metadata_json,
+                    QAReport.risk_score
+                ).outerjoin(QAReport, QAReport.email_template_id == EmailTemplate.id)
+                # Newest report first within each template (served by ix_qa_reports_tmpl_created)
+                .order_by(EmailTemplate.id, QAReport.created_at.desc())
+            ),
+            _fetch_eoa_email_list()
+        )
+        db_emails = db_result.all()
         emails = []
+        seen_ids = set()
         
         for email in db_emails:
-            metadata = email.get_metadata()
-            # Get QA report for risk score
-            qa_report = db.query(QAReport).filter(QAReport.email_template_id == email.id).first()
+            # email_template_id is not unique; rows are ordered newest report first per
+            # template, so the first row seen carries the latest risk score
+            if email.id in seen_ids:
+                continue
+            seen_ids.add(email.id)
             
+            metadata = email.metadata_json or {}
             emails.append({
                 "id": email.id,
                 "name": email.name,
                 "created_at": email.created_at.isoformat() if email.created_at else "",
                 "status": email.status,
                 "locale": metadata.get("locale", "N/A"),
-                "risk_score": qa_report.risk_score if qa_report else 0
+                "risk_score": email.risk_score if email.risk_score is not None else 0
             })
         
-        # Get emails from Email on Acid
-        try:
-            eo_emails = email_connector.get_email_list()
-            emails.extend(eo_emails)
-        except Exception as e:
-            # If Email on Acid is not available, continue with database emails
-            print(f"Warning: Could not fetch from Email on Acid: {e}")
+        # Add emails from Email on Acid
+        emails.extend(eo_emails)
         
-        return emails
+        return ORJSONResponse(emails)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch emails: {str(e)}")
 
 
+async def _fetch_eoa_email_list() -> List[Dict[str, Any]]:
+    """Fetch the Email on Acid email list, or an empty list if it is unavailable"""
+    try:
+        return await email_connector.get_email_list()
+    except Exception as e:
+        # If Email on Acid is not available, continue with database emails
+        print(f"Warning: Could not fetch from Email on Acid: {e}")
+        return []
+
+
 # GET /emails/{id} - full HTML + metadata
-@router.get("/emails/{email_id}", response_model=Dict[str, Any])
-async def get_email_details(email_id: str, db: Session = Depends(get_db)):
+@router.get("/emails/{email_id}", response_model=None)
+async def get_email_details(email_id: str, db: AsyncSession = Depends(get_db)):
     """Fetch full HTML and metadata for a specific email"""
     if not email_connector:
         raise HTTPException(status_code=500, detail="Email connector not initialized")
     
     try:
-        # First try to get from database
-        email_template = db.query(EmailTemplate).filter(EmailTemplate.id == email_id).first()
-        if email_template:
-            return {
-                "id": email_template.id,
-                "html_content": email_template.html_content,
-                "metadata": email_template.get_metadata()
-            }
-        
-        # If not in database, fetch from Email on Acid
-        email_details = email_connector.get_email_details(email_id)
-        return email_details
+        return ORJSONResponse(await _load_email_details(email_id, db))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch email details: {str(e)}")
 
 
+async def _load_email_details(email_id: str, db: AsyncSession) -> Dict[str, Any]:
+    """Load HTML and metadata for an email from the database, falling back to Email on Acid"""
+    # First try to get from database, selecting only the columns returned
+    email_template = (await db.execute(
+        select(
+            EmailTemplate.id,
+            EmailTemplate.html_content,
+            EmailTemplate.metadata_json
+        ).where(EmailTemplate.id == email_id)
+    )).first()
+    if email_template:
+        return {
+            "id": email_template.id,
+            "html_content": email_template.html_content,
+            "metadata": email_template.metadata_json or {}
+        }
+    
+    # If not in database, fetch from Email on Acid
+    return await _singleflight(("details", email_id), email_connector.get_email_details, email_id)
+
+
 # POST /emails/{id}/qa - run QA (deterministic + agentic)
 @router.post("/emails/{email_id}/qa", response_model=QAResponse)
-async def run_qa(email_id: str, request: QARequest, db: Session = Depends(get_db)):
+async def run_qa(email_id: str, request: QARequest, db: AsyncSession = Depends(get_db)):
     """Run QA process (deterministic + agentic) for an email"""
     if not email_connector or not agent_orchestrator:
         raise HTTPException(status_code=500, detail="Services not initialized")
     
     try:
-        # Fetch email details
-        email_details = await get_email_details(email_id, db)
+        # Concurrent requests for the same email wait on the run already in progress
+        report = await _singleflight(("qa", email_id), _run_and_save_qa, email_id, db)
         
-        # Run QA process
-        report = agent_orchestrator.run_qa_process(
-            email_id,
-            email_details["html_content"],
-            email_details["metadata"]
-        )
-        
-        # Save QA report to database
-        # Convert report to JSON-serializable format
-        try:
-            serializable_report = json.loads(json.dumps(report, default=str))
-        except Exception as serialize_error:
-            # If serialization fails, create a simplified version
-            serializable_report = {
-                "overall_status": report.get("overall_status", "unknown"),
-                "risk_score": report.get("risk_score", 0),
-                "email_id": report.get("email_id", email_id),
-                "message": "Full report could not be serialized"
-            }
+        # Serialize directly; the declared QAResponse documents the shape without re-validating it
+        return ORJSONResponse({"report": report})
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"QA process failed: {str(e)}")
+
+
+async def _run_and_save_qa(email_id: str, db: AsyncSession) -> Dict[str, Any]:
+    """Run the QA process for an email and save its report"""
+    # Fetch email details
+    email_details = await _load_email_details(email_id, db)
+    
+    # Run QA process off the event loop
+    report = await _run_qa_process(email_id, email_details["html_content"], email_details["metadata"])
+    
+    # Save QA report to database
+    serializable_report = _sanitize_report(report, report.get("email_id", email_id))
+    
+    # Create the report, or update the existing one, in a single statement
+    await _upsert_qa_report(db, {
+        "id": email_id,
+        "email_template_id": email_id,
+        "overall_status": report.get("overall_status", "unknown"),
+        "risk_score": report.get("risk_score", 0),
+        "report_data": serializable_report,
+        "is_uploaded": False  # Assuming this is from Email on Acid
+    })
+    
+    # Commit to database
+    await db.commit()
+    
+    return report
+
+
+async def _run_qa_process(email_id: str, html_content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the agent QA process off the event loop, in a worker process when enabled"""
+    global _qa_pool, _qa_slots
+    if _qa_slots is None:
+        _qa_slots = asyncio.Semaphore(_QA_MAX_CONCURRENT)
+    
+    async with _qa_slots:
+        if _QA_WORKER_PROCESSES <= 0:
+            return await run_in_threadpool(agent_orchestrator.run_qa_process, email_id, html_content, metadata)
         
-        existing_report = db.query(QAReport).filter(QAReport.id == email_id).first()
+        if _qa_pool is None:
+            # Spawned (not forked) workers start without this process's DB connections and threads
+            _qa_pool = ProcessPoolExecutor(
+                max_workers=_QA_WORKER_PROCESSES,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return await asyncio.get_running_loop().run_in_executor(
+            _qa_pool, run_qa_in_worker, weights_generation(), email_id, html_content, metadata
+        )
+
+
+def shutdown_qa_workers() -> None:
+    """Stop the QA worker processes (call on application shutdown)"""
+    global _qa_pool
+    if _qa_pool is not None:
+        _qa_pool.shutdown(wait=True, cancel_futures=True)
+        _qa_pool = None
+
+
+def _sanitize_report(report: Dict[str, Any], email_id: str) -> Dict[str, Any]:
+    """Convert a QA report to a JSON-serializable dict for storage"""
+    try:
+        return orjson.loads(orjson.dumps(report, default=str, option=orjson.OPT_NON_STR_KEYS))
+    except Exception:
+        # If serialization fails, store a simplified version
+        return {
+            "overall_status": report.get("overall_status", "unknown"),
+            "risk_score": report.get("risk_score", 0),
+            "email_id": email_id,
+            "message": "Full report could not be serialized"
+        }
+
+
+async def _upsert_qa_report(db: AsyncSession, values: Dict[str, Any]) -> None:
+    """Insert a QA report, updating status, score and data if the id already exists"""
+    dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        # No native upsert on this dialect; fall back to an ORM merge
+        existing_report = await db.get(QAReport, values["id"])
         if existing_report:
-            # Update existing report
-            existing_report.overall_status = report.get("overall_status", "unknown")
-            existing_report.risk_score = report.get("risk_score", 0)
-            existing_report.report_data = serializable_report
+            for column in _QA_REPORT_UPDATE_COLUMNS:
+                setattr(existing_report, column, values[column])
         else:
-            # Create new report
-            qa_report = QAReport(
-                id=email_id,
-                email_template_id=email_id,
-                overall_status=report.get("overall_status", "unknown"),
-                risk_score=report.get("risk_score", 0),
-                report_data=serializable_report,
-                is_uploaded=False  # Assuming this is from Email on Acid
-            )
-            db.add(qa_report)
-        
-        # Commit to database
-        db.commit()
-        
-        return QAResponse(report=report)
+            db.add(QAReport(**values))
+        return
+    
+    stmt = dialect_insert(QAReport).values(**values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[QAReport.id],
+        set_={column: stmt.excluded[column] for column in _QA_REPORT_UPDATE_COLUMNS}
+    )
+    await db.execute(stmt)
+
+
+# POST /emails/{id}/qa/jobs - queue QA in the background, returning a job id at once
+@router.post("/emails/{email_id}/qa/jobs", status_code=202, response_model=None)
+async def submit_qa_job(email_id: str, db: AsyncSession = Depends(get_db)):
+    """Start a background QA run for an email; poll GET /qa/jobs/{job_id} for the report"""
+    global _qa_jobs_pending
+    if not email_connector or not agent_orchestrator:
+        raise HTTPException(status_code=500, detail="Services not initialized")
+    if _qa_jobs_pending >= _QA_MAX_PENDING_JOBS:
+        raise HTTPException(status_code=503, detail="Too many QA jobs pending, retry later")
+    
+    # Reserve the slot before the first await so concurrent submissions cannot overshoot
+    _qa_jobs_pending += 1
+    job_id = uuid7().hex
+    try:
+        # Persisted, so any worker process can answer polls
+        db.add(QAJob(id=job_id, email_id=email_id, status="pending"))
+        await db.commit()
     except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"QA process failed: {str(e)}")
+        _qa_jobs_pending -= 1
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to queue QA job: {str(e)}")
+    
+    task = asyncio.create_task(_run_qa_job(job_id, email_id))
+    _qa_job_tasks.add(task)
+    task.add_done_callback(_qa_job_finished)
+    
+    return ORJSONResponse({"job_id": job_id, "status": "pending"}, status_code=202)
+
+
+# GET /qa/jobs/{job_id} - status (and report, once completed) of a background QA run
+@router.get("/qa/jobs/{job_id}", response_model=None)
+async def get_qa_job(job_id: str, db: AsyncSession = Depends(get_db)):
+    """Fetch the status of a background QA run"""
+    job = await db.get(QAJob, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="QA job not found")
+    
+    body: Dict[str, Any] = {"job_id": job.id, "email_id": job.email_id, "status": job.status}
+    if job.status == "failed":
+        body["error"] = job.error
+    elif job.status == "completed":
+        # The saved report for the email (the latest run, if it was re-run since)
+        report = await db.get(QAReport, job.qa_report_id)
+        body["report"] = _decode_report_data(report.report_data) if report else None
+    return ORJSONResponse(body)
+
+
+async def _run_qa_job(job_id: str, email_id: str) -> None:
+    """Run and save QA for a queued job with its own session, recording the outcome"""
+    # Stays the outcome if the task is cancelled (e.g. at shutdown) before the run finishes
+    outcome = {"status": "failed", "error": "QA job interrupted by shutdown"}
+    try:
+        async with AsyncSessionLocal() as db:
+            try:
+                await _singleflight(("qa", email_id), _run_and_save_qa, email_id, db)
+            except Exception as e:
+                await db.rollback()
+                outcome = {"status": "failed", "error": f"QA process failed: {str(e)}"}
+            else:
+                # _run_and_save_qa saves the report under the email id
+                outcome = {"status": "completed", "qa_report_id": email_id}
+    finally:
+        await _record_qa_job_outcome(job_id, outcome)
+
+
+async def _record_qa_job_outcome(job_id: str, outcome: Dict[str, Any]) -> None:
+    """Write a finished job's status in a fresh session (a failed write leaves the row pending)"""
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(QAJob).where(QAJob.id == job_id).values(**outcome))
+            await db.commit()
+    except Exception as e:
+        # Left pending; the next startup marks it failed
+        print(f"Warning: Could not record QA job {job_id} as {outcome['status']}: {e}")
+
+
+async def fail_interrupted_qa_jobs() -> int:
+    """Mark jobs left pending by a previous run as failed (call on application startup)
+    
+    A job another worker is still running overwrites this with its real outcome when it finishes.
+    
+    Returns:
+        Number of jobs marked failed
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            update(QAJob)
+            .where(QAJob.status == "pending")
+            .values(status="failed", error="QA job interrupted by restart")
+        )
+        await db.commit()
+        return result.rowcount
+
+
+async def cancel_qa_jobs() -> None:
+    """Cancel running QA jobs and wait until each has recorded its failure (call on application shutdown)"""
+    tasks = list(_qa_job_tasks)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _qa_job_finished(task: "asyncio.Task[None]") -> None:
+    """Release a finished job's task reference and pending slot"""
+    global _qa_jobs_pending
+    _qa_job_tasks.discard(task)
+    _qa_jobs_pending -= 1
+
+
+def _decode_report_data(report_data: Any) -> Any:
+    """Stored report data as JSON-compatible objects"""
+    # PostgreSQL decodes JSON natively; other backends may hand back a string
+    if not IS_POSTGRES and isinstance(report_data, (str, bytes)):
+        return orjson.loads(report_data)
+    return report_data
 
 
 # GET /reports/{id} - fetch saved report
-@router.get("/reports/{report_id}", response_model=Dict[str, Any])
-async def get_report(report_id: str, db: Session = Depends(get_db)):
+@router.get("/reports/{report_id}", response_model=None)
+async def get_report(report_id: str, db: AsyncSession = Depends(get_db)):
     """Fetch saved QA report"""
     try:
         # Try to get report from database
-        report = db.query(QAReport).filter(QAReport.id == report_id).first()
+        report = (await db.execute(
+            select(QAReport).where(QAReport.id == report_id)
+        )).scalars().first()
         if report:
-            # Handle the case where report_data might be a string or dict
-            report_data = report.report_data
-            if isinstance(report_data, str):
-                import json
-                report_data = json.loads(report_data)
-            
-            return {
+            return ORJSONResponse({
                 "report_id": report.id,
                 "email_template_id": report.email_template_id,
                 "created_at": report.created_at.isoformat() if report.created_at else "",
                 "overall_status": report.overall_status,
                 "risk_score": report.risk_score,
-                "report_data": report_data
-            }
+                "report_data": _decode_report_data(report.report_data)
+            })
         
         # If not found in database, return placeholder
-        return {
+        return ORJSONResponse({
             "report_id": report_id,
             "status": "not_found",
             "message": "Report not found in database"
-        }
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch report: {str(e)}")
 
 
 # POST /upload - upload HTML file for QA analysis
 @router.post("/upload")
-async def upload_email_html(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def upload_email_html(file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
     """Upload HTML file for QA analysis"""
     if not agent_orchestrator:
         raise HTTPException(status_code=500, detail="Agent orchestrator not initialized")
     
     try:
-        # Create uploads directory if it doesn't exist
-        upload_dir = "uploads"
-        os.makedirs(upload_dir, exist_ok=True)
-        
-        # Generate unique filename
-        file_id = str(uuid.uuid4())
-        file_path = os.path.join(upload_dir, f"{file_id}.html")
-        
-        # Save uploaded file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # Generate unique ID (32 hex characters, no hyphens)
+        file_id = uuid7().hex
         
-        # Extract HTML content and basic metadata
-        html_content = content.decode('utf-8')
+        # Extract HTML content and basic metadata (the HTML is persisted on the EmailTemplate row)
+        html_content = await _read_upload_text(file)
         metadata = {
             "subject": "Uploaded Email",
             "preheader": "Uploaded HTML file for QA analysis",
@@ -245,56 +543,41 @@ async def upload_email_html(file: UploadFile = File(...), db: Session = Depends(
             "locale": "en-US"
         }
         
-        # Run QA process
-        report = agent_orchestrator.run_qa_process(
-            file_id,
-            html_content,
-            metadata
-        )
-        
-        # Save to database
-        # Save email template
-        email_template = EmailTemplate(
-            id=file_id,
-            name=file.filename or "Uploaded Email",
-            html_content=html_content,
-            status="processed"
-        )
-        email_template.set_metadata(metadata)
-        db.add(email_template)
+        # Run QA process off the event loop
+        report = await _run_qa_process(file_id, html_content, metadata)
         
-        # Save upload record
-        upload_record = UploadRecord(
-            id=file_id,
-            original_filename=file.filename or "Uploaded Email",
-            processed=True,
-            qa_report_id=file_id
-        )
-        db.add(upload_record)
+        # JSON-safe copy of the report for storage
+        serializable_report = _sanitize_report(report, file_id)
         
-        # Save QA report
-        try:
-            serializable_report = json.loads(json.dumps(report, default=str))
-        except Exception as serialize_error:
-            serializable_report = {
+        # Save to database with Core inserts (no ORM objects are needed afterwards), in
+        # one transaction that commits on exit and rolls all three back on failure
+        async with db.begin():
+            # Save email template
+            await db.execute(insert(EmailTemplate), [{
+                "id": file_id,
+                "name": file.filename or "Uploaded Email",
+                "html_content": html_content,
+                "status": "processed",
+                "metadata_json": metadata
+            }])
+            
+            # Save upload record
+            await db.execute(insert(UploadRecord), [{
+                "id": file_id,
+                "original_filename": file.filename or "Uploaded Email",
+                "processed": True,
+                "qa_report_id": file_id
+            }])
+            
+            # Save QA report
+            await db.execute(insert(QAReport), [{
+                "id": file_id,
+                "email_template_id": file_id,
                 "overall_status": report.get("overall_status", "unknown"),
                 "risk_score": report.get("risk_score", 0),
-                "email_id": file_id,
-                "message": "Full report could not be serialized"
-            }
-        
-        qa_report = QAReport(
-            id=file_id,
-            email_template_id=file_id,
-            overall_status=report.get("overall_status", "unknown"),
-            risk_score=report.get("risk_score", 0),
-            report_data=serializable_report,
-            is_uploaded=True
-        )
-        db.add(qa_report)
-        
-        # Commit to database
-        db.commit()
+                "report_data": serializable_report,
+                "is_uploaded": True
+            }])
         
         return {
             "message": "File uploaded and analyzed successfully",
@@ -302,154 +585,44 @@ async def upload_email_html(file: UploadFile = File(...), db: Session = Depends(
             "email_id": file_id
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
 
+async def _read_upload_text(file: UploadFile) -> str:
+    """Decode an uploaded file as UTF-8 chunk by chunk, never holding all of its bytes"""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    parts = []
+    while True:
+        chunk = await file.read(_UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b'', final=True))
+    return ''.join(parts)
+
+
 # GET /rules - get all rule configurations
 @router.get("/rules", response_model=List[RuleConfigResponse])
-async def get_rules(db: Session = Depends(get_db)):
+async def get_rules(db: AsyncSession = Depends(get_db)):
     """Get all rule configurations"""
     try:
-        rules = db.query(RuleConfiguration).all()
-        
-        # If no rules exist, create default rules
-        if not rules:
-            default_rules = [
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": "ALT Text Required",
-                    "description": "Ensure meaningful ALT text is applied",
-                    "weight": 10.0,
-                    "priority": "Medium",
-                    "override_enabled": True,
-                    "business_override_text": "Allow decorative images with empty ALT",
-                    "error_message": "ALT text missing. Suggested: <AI-generated suggestion>",
-                    "category": "accessibility"
-                },
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": "Decorative Image ALT Skip",
-                    "description": "Skip ALT text requirement for decorative images",
-                    "weight": 5.0,
-                    "priority": "Low",
-                    "override_enabled": False,
-                    "business_override_text": "",
-                    "error_message": "Decorative image requires ALT text",
-                    "category": "accessibility"
-                },
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": "CTA Branding Color Check",
-                    "description": "Ensure CTA buttons use brand colors",
-                    "weight": 15.0,
-                    "priority": "High",
-                    "override_enabled": True,
-                    "business_override_text": "Allow non-brand colors for special campaigns",
-                    "error_message": "CTA color does not match brand guidelines",
-                    "category": "compliance"
-                },
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": "Link Validation",
-                    "description": "Check for broken or malformed links",
-                    "weight": 20.0,
-                    "priority": "High",
-                    "override_enabled": True,
-                    "business_override_text": "Allow placeholder links for development",
-                    "error_message": "Invalid or broken link detected",
-                    "category": "deterministic"
-                },
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": "Template Width Check",
-                    "description": "Ensure template width is within acceptable range",
-                    "weight": 10.0,
-                    "priority": "Low",
-                    "override_enabled": True,
-                    "business_override_text": "Allow custom widths for special templates",
-                    "error_message": "Template width outside acceptable range",
-                    "category": "deterministic"
-                },
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": "Font Size Check",
-                    "description": "Ensure font sizes comply with brand guidelines",
-                    "weight": 10.0,
-                    "priority": "Medium",
-                    "override_enabled": False,
-                    "business_override_text": "",
-                    "error_message": "Font size does not match brand guidelines",
-                    "category": "compliance"
-                },
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": "Copy Tone Check",
-                    "description": "Ensure copy tone matches brand guidelines",
-                    "weight": 10.0,
-                    "priority": "Medium",
-                    "override_enabled": True,
-                    "business_override_text": "Allow casual tone for specific campaigns",
-                    "error_message": "Copy tone does not match brand guidelines",
-                    "category": "tone"
-                },
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": "Accessibility Color Contrast",
-                    "description": "Ensure sufficient color contrast for accessibility",
-                    "weight": 10.0,
-                    "priority": "Medium",
-                    "override_enabled": False,
-                    "business_override_text": "",
-                    "error_message": "Insufficient color contrast detected",
-                    "category": "accessibility"
-                },
-                {
-                    "id": str(uuid.uuid4()),
-                    "name": "Spam Word Check",
-                    "description": "Detect spammy words that may affect deliverability",
-                    "weight": 10.0,
-                    "priority": "Low",
-                    "override_enabled": True,
-                    "business_override_text": "Allow promotional language for marketing emails",
-                    "error_message": "Spammy words detected in content",
-                    "category": "tone"
-                }
-            ]
-            
-            for rule_data in default_rules:
-                rule = RuleConfiguration(**rule_data)
-                db.add(rule)
-            
-            db.commit()
-            rules = db.query(RuleConfiguration).all()
+        # Defaults are seeded once at startup (database.init_db.seed_default_rules)
+        rules = (await db.execute(select(RuleConfiguration))).scalars().all()
         
-        return [
-            RuleConfigResponse(
-                id=rule.id,
-                name=rule.name,
-                description=rule.description,
-                weight=rule.weight,
-                priority=rule.priority,
-                override_enabled=rule.override_enabled,
-                business_override_text=rule.business_override_text or "",
-                error_message=rule.error_message or "",
-                category=rule.category,
-                created_at=rule.created_at.isoformat() if rule.created_at else "",
-                updated_at=rule.updated_at.isoformat() if rule.updated_at else ""
-            )
-            for rule in rules
-        ]
+        return _rules_response(rules)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch rules: {str(e)}")
 
 
 # PUT /rules/{rule_id} - update rule configuration
 @router.put("/rules/{rule_id}", response_model=RuleConfigResponse)
-async def update_rule(rule_id: str, rule_data: RuleConfigRequest, db: Session = Depends(get_db)):
+async def update_rule(rule_id: str, rule_data: RuleConfigRequest, db: AsyncSession = Depends(get_db)):
     """Update rule configuration"""
     try:
-        rule = db.query(RuleConfiguration).filter(RuleConfiguration.id == rule_id).first()
+        rule = (await db.execute(
+            select(RuleConfiguration).where(RuleConfiguration.id == rule_id)
+        )).scalars().first()
         if not rule:
             raise HTTPException(status_code=404, detail="Rule not found")
         
@@ -463,36 +636,25 @@ async def update_rule(rule_id: str, rule_data: RuleConfigRequest, db: Session =
         rule.error_message = rule_data.error_message
         rule.category = rule_data.category
         
-        db.commit()
-        db.refresh(rule)
+        await db.commit()
+        invalidate_weights()
+        await db.refresh(rule)
         
-        return RuleConfigResponse(
-            id=rule.id,
-            name=rule.name,
-            description=rule.description,
-            weight=rule.weight,
-            priority=rule.priority,
-            override_enabled=rule.override_enabled,
-            business_override_text=rule.business_override_text or "",
-            error_message=rule.error_message or "",
-            category=rule.category,
-            created_at=rule.created_at.isoformat() if rule.created_at else "",
-            updated_at=rule.updated_at.isoformat() if rule.updated_at else ""
-        )
+        return _rule_response(rule)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update rule: {str(e)}")
 
 
 # POST /rules - create new rule configuration
 @router.post("/rules", response_model=RuleConfigResponse)
-async def create_rule(rule_data: RuleConfigRequest, db: Session = Depends(get_db)):
+async def create_rule(rule_data: RuleConfigRequest, db: AsyncSession = Depends(get_db)):
     """Create new rule configuration"""
     try:
         rule = RuleConfiguration(
-            id=str(uuid.uuid4()),
+            id=str(uuid7()),
             name=rule_data.name,
             description=rule_data.description,
             weight=rule_data.weight,
@@ -504,30 +666,19 @@ async def create_rule(rule_data: RuleConfigRequest, db: Session = Depends(get_db
         )
         
         db.add(rule)
-        db.commit()
-        db.refresh(rule)
+        await db.commit()
+        invalidate_weights()
+        await db.refresh(rule)
         
-        return RuleConfigResponse(
-            id=rule.id,
-            name=rule.name,
-            description=rule.description,
-            weight=rule.weight,
-            priority=rule.priority,
-            override_enabled=rule.override_enabled,
-            business_override_text=rule.business_override_text or "",
-            error_message=rule.error_message or "",
-            category=rule.category,
-            created_at=rule.created_at.isoformat() if rule.created_at else "",
-            updated_at=rule.updated_at.isoformat() if rule.updated_at else ""
-        )
+        return _rule_response(rule)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to create rule: {str(e)}")
 
 
 # PUT /scoring-model - update scoring model formula
 @router.put("/scoring-model")
-async def update_scoring_model(formula: str = Body(..., embed=True), db: Session = Depends(get_db)):
+async def update_scoring_model(formula: str = Body(..., embed=True), db: AsyncSession = Depends(get_db)):
     """Update scoring model formula"""
     try:
         # In a real implementation, this would save the formula to a configuration table
@@ -3,14 +3,25 @@ Email on Acid API Connector for the Email QA Agentic Platform
 Handles fetching email proofs and metadata from Email on Acid
 """
 
-import requests
+import httpx
 from typing import Dict, Any, List
+import asyncio
 import os
 from dotenv import load_dotenv
+from result_cache import ResultCache
 
 # Load environment variables
 load_dotenv()
 
+# Pooled connections kept open to the Email on Acid API
+_POOL_SIZE = 20
+# Seconds before an Email on Acid request is abandoned
+_REQUEST_TIMEOUT = 10.0
+# Seconds a GET response is served from memory before it is revalidated
+_RESPONSE_TTL = 30.0
+# GET responses kept per connector (fresh bodies, and ETag validators for revalidation)
+_RESPONSE_CACHE_SIZE = 256
+
 
 class EmailOnAcidConnector:
     def __init__(self):
@@ -21,8 +32,26 @@ class EmailOnAcidConnector:
         # Check if credentials are available
         if not self.api_key or not self.api_secret:
             raise ValueError("Email on Acid API credentials not found in environment variables")
+        
+        # One authenticated async client reuses connections (and TLS handshakes) across
+        # requests without blocking the event loop
+        self._client = httpx.AsyncClient(
+            auth=(self.api_key, self.api_secret),
+            base_url=self.base_url,
+            timeout=_REQUEST_TIMEOUT,
+            limits=httpx.Limits(max_connections=_POOL_SIZE, max_keepalive_connections=_POOL_SIZE)
+        )
+        
+        # GET bodies by endpoint: served directly while fresh, then revalidated with
+        # If-None-Match so an unchanged resource costs a 304 instead of a full body
+        self._fresh_responses = ResultCache(maxsize=_RESPONSE_CACHE_SIZE, ttl=_RESPONSE_TTL)
+        self._etag_responses = ResultCache(maxsize=_RESPONSE_CACHE_SIZE)
     
-    def get_email_list(self) -> List[Dict[str, Any]]:
+    async def aclose(self) -> None:
+        """Close pooled connections (call on application shutdown)"""
+        await self._client.aclose()
+    
+    async def get_email_list(self) -> List[Dict[str, Any]]:
         """
         Fetch list of email proofs from Email on Acid
         
@@ -36,7 +65,7 @@ class EmailOnAcidConnector:
         # Return empty list when no credentials are available
         return []
     
-    def get_email_details(self, email_id: str) -> Dict[str, Any]:
+    async def get_email_details(self, email_id: str) -> Dict[str, Any]:
         """
         Fetch full HTML and metadata for a specific email
         
@@ -64,7 +93,7 @@ class EmailOnAcidConnector:
             "assets": []
         }
     
-    def _make_api_request(self, endpoint: str, method: str = "GET", data: Dict = None) -> Dict[str, Any]:
+    async def _make_api_request(self, endpoint: str, method: str = "GET", data: Dict = None) -> Dict[str, Any]:
         """
         Make authenticated API request to Email on Acid
         
@@ -74,20 +103,14 @@ class EmailOnAcidConnector:
             data: Data to send with request
             
         Returns:
-            API response as dictionary
+            API response as dictionary (GET responses are cached and shared; do not modify)
         """
-        # Construct full URL
-        url = f"{self.base_url}/{endpoint}"
-        
-        # Set up authentication
-        auth = (self.api_key, self.api_secret)
-        
-        # Make request
+        # Make request (base URL and authentication are set on the shared client)
         try:
             if method == "GET":
-                response = requests.get(url, auth=auth)
+                return await self._cached_get(endpoint)
             elif method == "POST":
-                response = requests.post(url, auth=auth, json=data)
+                response = await self._client.post(endpoint, json=data)
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
             
@@ -96,19 +119,49 @@ class EmailOnAcidConnector:
             
             # Return JSON response
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             raise Exception(f"API request failed: {str(e)}")
+    
+    async def _cached_get(self, endpoint: str) -> Dict[str, Any]:
+        """GET an endpoint through the TTL cache, revalidating stale bodies by ETag"""
+        body = self._fresh_responses.get(endpoint)
+        if body is not None:
+            return body
+        
+        validator = self._etag_responses.get(endpoint)
+        headers = {"If-None-Match": validator[0]} if validator else None
+        response = await self._client.get(endpoint, headers=headers)
+        
+        if response.status_code == 304 and validator:
+            body = validator[1]
+        else:
+            # Raise exception for bad status codes
+            response.raise_for_status()
+            body = response.json()
+            etag = response.headers.get("ETag")
+            if etag:
+                self._etag_responses.put(endpoint, (etag, body))
+        
+        self._fresh_responses.put(endpoint, body)
+        return body
 
 
 # Example usage
-if __name__ == "__main__":
+async def _example():
+    connector = EmailOnAcidConnector()
     try:
-        connector = EmailOnAcidConnector()
-        emails = connector.get_email_list()
+        emails = await connector.get_email_list()
         print("Email list:", emails)
         
         if emails:
-            email_details = connector.get_email_details(emails[0]["id"])
+            email_details = await connector.get_email_details(emails[0]["id"])
             print("Email details:", email_details)
+    finally:
+        await connector.aclose()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_example())
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
@@ -3,6 +3,8 @@ Database configuration for the Email QA Agentic Platform
 """
 
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -14,19 +16,53 @@ load_dotenv()
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./test.db")
 
+# Whether the configured database is PostgreSQL (native JSON/JSONB decoding, pool sizing)
+IS_POSTGRES = make_url(DATABASE_URL).get_backend_name() == "postgresql"
+
+# Log every SQL statement (development only)
+SQL_ECHO = os.getenv("SQL_ECHO", "false").lower() in ("1", "true", "yes")
+
+# Connection pool sizing for server databases; SQLite keeps SQLAlchemy's defaults,
+# which depend on whether the database is a file or in memory
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "20")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+    "pool_timeout": 30,
+    "pool_recycle": 3600,
+}
+_pool_options = POOL_OPTIONS if make_url(DATABASE_URL).get_backend_name() != "sqlite" else {}
+
 # Create database engine
-engine = create_engine(DATABASE_URL, echo=True)
+engine = create_engine(DATABASE_URL, echo=SQL_ECHO, pool_pre_ping=True)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async drivers for the API, by backend
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(database_url: str) -> str:
+    """Swap a database URL's driver for its asyncio counterpart"""
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)
+    return url.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+# Async engine and session factory used by the API endpoints; the sync engine above
+# stays for table creation and for agents that run in worker threads
+async_engine = create_async_engine(
+    to_async_url(DATABASE_URL), echo=SQL_ECHO, pool_pre_ping=True, **_pool_options
+)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for declarative models
 Base = declarative_base()
 
-def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+async def get_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
\ No newline at end of file
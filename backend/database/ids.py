@@ -0,0 +1,42 @@
+"""
+Primary key generation for the Email QA Agentic Platform
+Time-ordered UUIDs keep new rows at the right edge of the primary key index
+"""
+
+import os
+import threading
+import time
+import uuid
+
+# Largest value of the 12-bit sequence that orders ids created in the same millisecond
+_SEQUENCE_MAX = 0xFFF
+
+_lock = threading.Lock()
+_last_ms = 0
+_sequence = 0
+
+
+def uuid7() -> uuid.UUID:
+    """Generate a UUID version 7 (RFC 9562): 48-bit Unix milliseconds, then random bits
+    
+    Ids from this process sort in creation order, including within one millisecond.
+    """
+    global _last_ms, _sequence
+    
+    with _lock:
+        timestamp_ms = time.time_ns() // 1_000_000
+        if timestamp_ms > _last_ms:
+            _last_ms = timestamp_ms
+            _sequence = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        elif _sequence < _SEQUENCE_MAX:
+            # Same millisecond (or the clock stepped back): keep counting from the last id
+            _sequence += 1
+        else:
+            # Sequence exhausted: borrow the next millisecond
+            _last_ms += 1
+            _sequence = 0
+        timestamp_ms, sequence = _last_ms, _sequence
+    
+    random_bits = int.from_bytes(os.urandom(8), "big") & 0x3FFFFFFFFFFFFFFF
+    value = (timestamp_ms << 80) | (0x7 << 76) | (sequence << 64) | (0b10 << 62) | random_bits
+    return uuid.UUID(int=value)
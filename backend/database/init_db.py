@@ -2,15 +2,162 @@
 Database initialization script for the Email QA Agentic Platform
 """
 
-from database.config import engine, Base
-from database.models import EmailTemplate, QAReport, UploadRecord
+from database.config import engine, Base, AsyncSessionLocal, IS_POSTGRES
+from database.models import EmailTemplate, QAJob, QAReport, UploadRecord, RuleConfiguration
+from database.ids import uuid7
+from sqlalchemy import delete, false, func, insert, inspect, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+
+# Default rule configurations seeded into an empty rule_configurations table (ids added on insert)
+_DEFAULT_RULE_TEMPLATES = [
+    {
+        "name": "ALT Text Required",
+        "description": "Ensure meaningful ALT text is applied",
+        "weight": 10.0,
+        "priority": "Medium",
+        "override_enabled": True,
+        "business_override_text": "Allow decorative images with empty ALT",
+        "error_message": "ALT text missing. Suggested: <AI-generated suggestion>",
+        "category": "accessibility"
+    },
+    {
+        "name": "Decorative Image ALT Skip",
+        "description": "Skip ALT text requirement for decorative images",
+        "weight": 5.0,
+        "priority": "Low",
+        "override_enabled": False,
+        "business_override_text": "",
+        "error_message": "Decorative image requires ALT text",
+        "category": "accessibility"
+    },
+    {
+        "name": "CTA Branding Color Check",
+        "description": "Ensure CTA buttons use brand colors",
+        "weight": 15.0,
+        "priority": "High",
+        "override_enabled": True,
+        "business_override_text": "Allow non-brand colors for special campaigns",
+        "error_message": "CTA color does not match brand guidelines",
+        "category": "compliance"
+    },
+    {
+        "name": "Link Validation",
+        "description": "Check for broken or malformed links",
+        "weight": 20.0,
+        "priority": "High",
+        "override_enabled": True,
+        "business_override_text": "Allow placeholder links for development",
+        "error_message": "Invalid or broken link detected",
+        "category": "deterministic"
+    },
+    {
+        "name": "Template Width Check",
+        "description": "Ensure template width is within acceptable range",
+        "weight": 10.0,
+        "priority": "Low",
+        "override_enabled": True,
+        "business_override_text": "Allow custom widths for special templates",
+        "error_message": "Template width outside acceptable range",
+        "category": "deterministic"
+    },
+    {
+        "name": "Font Size Check",
+        "description": "Ensure font sizes comply with brand guidelines",
+        "weight": 10.0,
+        "priority": "Medium",
+        "override_enabled": False,
+        "business_override_text": "",
+        "error_message": "Font size does not match brand guidelines",
+        "category": "compliance"
+    },
+    {
+        "name": "Copy Tone Check",
+        "description": "Ensure copy tone matches brand guidelines",
+        "weight": 10.0,
+        "priority": "Medium",
+        "override_enabled": True,
+        "business_override_text": "Allow casual tone for specific campaigns",
+        "error_message": "Copy tone does not match brand guidelines",
+        "category": "tone"
+    },
+    {
+        "name": "Accessibility Color Contrast",
+        "description": "Ensure sufficient color contrast for accessibility",
+        "weight": 10.0,
+        "priority": "Medium",
+        "override_enabled": False,
+        "business_override_text": "",
+        "error_message": "Insufficient color contrast detected",
+        "category": "accessibility"
+    },
+    {
+        "name": "Spam Word Check",
+        "description": "Detect spammy words that may affect deliverability",
+        "weight": 10.0,
+        "priority": "Low",
+        "override_enabled": True,
+        "business_override_text": "Allow promotional language for marketing emails",
+        "error_message": "Spammy words detected in content",
+        "category": "tone"
+    }
+]
+
+# PostgreSQL advisory lock key serializing default rule seeding across processes
+_SEED_RULES_LOCK_KEY = 0x5EED_0001
 
 def init_db():
     """Initialize database tables"""
     # Create all tables
     Base.metadata.create_all(bind=engine)
+    migrate_db()
     print("Database tables created successfully!")
 
+def migrate_db():
+    """Upgrade existing tables to the current models (safe to rerun)"""
+    # Indexes added after a table was first created
+    for index in QAReport.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
+    
+    if not IS_POSTGRES:
+        # SQLite's JSON type reads the JSON text already stored in metadata_json
+        return
+    
+    # email_templates.metadata_json: JSON text -> JSONB
+    columns = {column["name"]: column for column in inspect(engine).get_columns("email_templates")}
+    metadata_column = columns.get("metadata_json")
+    if metadata_column is not None and not isinstance(metadata_column["type"], JSONB):
+        with engine.begin() as connection:
+            connection.execute(text(
+                "ALTER TABLE email_templates ALTER COLUMN metadata_json TYPE jsonb "
+                "USING NULLIF(metadata_json, '')::jsonb"
+            ))
+        print("Migrated email_templates.metadata_json to JSONB")
+
+async def seed_default_rules() -> bool:
+    """Insert the default rule configurations if none exist
+    
+    Returns:
+        True if the defaults were inserted
+    """
+    async with AsyncSessionLocal() as db:
+        # Lock before counting, so workers or replicas starting together seed only once;
+        # the lock is held until this transaction commits or rolls back
+        if IS_POSTGRES:
+            await db.execute(select(func.pg_advisory_xact_lock(_SEED_RULES_LOCK_KEY)))
+        else:
+            # A write (even one matching no rows) takes SQLite's database write lock
+            await db.execute(delete(RuleConfiguration).where(false()))
+        
+        rule_count = (await db.execute(select(func.count()).select_from(RuleConfiguration))).scalar()
+        if rule_count:
+            return False
+        
+        # One executemany INSERT for all defaults
+        default_rules = [dict(template, id=str(uuid7())) for template in _DEFAULT_RULE_TEMPLATES]
+        await db.execute(insert(RuleConfiguration), default_rules)
+        await db.commit()
+        return True
+
 def drop_db():
     """Drop all tables (use with caution!)"""
     Base.metadata.drop_all(bind=engine)
@@ -2,11 +2,11 @@
 Database models for the Email QA Agentic Platform
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Boolean, Float, Index
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 from database.config import Base
 from typing import Dict, Any
-import json
 
 
 class EmailTemplate(Base):
@@ -17,17 +17,15 @@ class EmailTemplate(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     status = Column(String, default="active")
     html_content = Column(Text)
-    metadata_json = Column(Text)  # Store as JSON string
+    metadata_json = Column(JSON().with_variant(JSONB(), "postgresql"))  # Native JSONB on PostgreSQL
     
     def set_metadata(self, metadata: Dict[str, Any]):
-        """Set metadata as JSON string"""
-        self.metadata_json = json.dumps(metadata)
+        """Set metadata dictionary"""
+        self.metadata_json = metadata
     
     def get_metadata(self) -> Dict[str, Any]:
         """Get metadata as dictionary"""
-        if self.metadata_json:
-            return json.loads(self.metadata_json)
-        return {}
+        return self.metadata_json or {}
 
 
 class QAReport(Base):
@@ -40,6 +38,11 @@ class QAReport(Base):
     risk_score = Column(Integer)
     report_data = Column(JSON)  # PostgreSQL supports JSON natively
     is_uploaded = Column(Boolean, default=False)  # To distinguish between Email on Acid and uploaded files
+    
+    __table_args__ = (
+        # Latest report per template (GET /emails join, report lookups by template)
+        Index("ix_qa_reports_tmpl_created", "email_template_id", created_at.desc()),
+    )
 
 
 class UploadRecord(Base):
@@ -65,4 +68,16 @@ class RuleConfiguration(Base):
     error_message = Column(Text)
     category = Column(String)  # deterministic, compliance, tone, accessibility
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class QAJob(Base):
+    __tablename__ = "qa_jobs"
+    
+    id = Column(String, primary_key=True, index=True)
+    email_id = Column(String, index=True)
+    status = Column(String, default="pending")  # pending, completed, failed
+    error = Column(Text, nullable=True)
+    qa_report_id = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -8,60 +8,124 @@ All tests return a list of issues in the format:
 }
 """
 
-from typing import List, Dict, Any
-from bs4 import BeautifulSoup
+from typing import List, Dict, Any, Iterable, NamedTuple, Optional, Tuple
+from itertools import chain
+from lxml import etree
+import lxml.html
 import re
+import urllib.parse
+from html_utils import parse_html
+from result_cache import ResultCache, content_digest
+
+
+class CheckResult(NamedTuple):
+    """
+    Immutable outcome of one deterministic check
+    
+    The checks build these internally; the public functions convert them to the
+    documented dict format at the boundary (see _as_dicts).
+    """
+    test_name: str
+    status: str
+    details: str
+
+
+# XPath queries compiled once; evaluated in C over the parsed document
+_IMG_XPATH = etree.XPath('//img')
+_LINK_XPATH = etree.XPath('//a[@href]')
+# Text nodes and comment bodies over 200 characters before stripping, in document order
+# (the length test runs in libxml2, so short nodes never reach Python)
+_LONG_TEXT_XPATH = etree.XPath('//text()[string-length() > 200] | //comment()[string-length() > 200]')
+
+# Tag prefilters for the standalone checks: HTML without a match cannot contain the element,
+# so it is not parsed at all
+_IMG_TAG_RE = re.compile(r'<img\b', re.IGNORECASE)
+_LINK_TAG_RE = re.compile(r'<a\b', re.IGNORECASE)
+
+# Results of the checks that depend only on the HTML, by content digest (templates are
+# often re-validated unchanged); see _html_check_results
+_html_results = ResultCache(maxsize=64)
+
+# Metadata fields that must be present, in report order:
+# (metadata key, test name, details when missing, details format when present)
+_META_CHECKS = (
+    ('subject', 'subject_line', 'Missing subject line', 'Subject line present: {}'),
+    ('preheader', 'preheader', 'Missing preheader', 'Preheader present'),
+    ('template_name', 'template_meta', 'Missing template name', 'Template name present: {}'),
+    ('locale', 'template_meta', 'Missing locale', 'Locale present: {}'),
+)
+
+# Accepted link schemes, matched case-insensitively; group 1 is set for http(s) links
+_VALID_SCHEME_RE = re.compile(r'^(?:(https?)://|mailto:|#)', re.IGNORECASE)
+
+
+def _as_dicts(results: Iterable[CheckResult]) -> List[Dict[str, Any]]:
+    """Convert check results to the documented issue dicts"""
+    return [
+        {"test_name": test_name, "status": status, "details": details}
+        for test_name, status, details in results
+    ]
+
+
+def _to_html(element: lxml.html.HtmlElement) -> str:
+    """Serialize an element (without its tail text) for issue details"""
+    return etree.tostring(element, encoding='unicode', method='html', with_tail=False)
+
+
+def _parse_if_tag(html_content: str, tag_re: re.Pattern) -> lxml.html.HtmlElement:
+    """Parse the HTML, or return an empty document when tag_re finds no candidate tag"""
+    if tag_re.search(html_content) is None:
+        return lxml.html.Element('html')
+    return parse_html(html_content)
+
+
+def _image_source(img: lxml.html.HtmlElement) -> str:
+    """Identify an image in issue details by its src (an attribute lookup, no serialization)"""
+    return img.get('src') or '<no src>'
 
 
 def check_alt_text(html_content: str) -> List[Dict[str, Any]]:
     """Check for missing ALT text in images"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    images = soup.find_all('img')
+    return _as_dicts(_check_alt_text(_parse_if_tag(html_content, _IMG_TAG_RE)))
+
+
+def _check_alt_text(tree: lxml.html.HtmlElement) -> List[CheckResult]:
+    """check_alt_text on an already parsed document"""
+    images = _IMG_XPATH(tree)
     
     issues = []
     for img in images:
         alt_text = img.get('alt')
         if not alt_text or alt_text.strip() == '':
-            issues.append({
-                "test_name": "alt_text",
-                "status": "fail",
-                "details": f"Image missing ALT text: {img}"
-            })
+            issues.append(CheckResult("alt_text", "fail", f"Image missing ALT text: {_image_source(img)}"))
         else:
-            issues.append({
-                "test_name": "alt_text",
-                "status": "pass",
-                "details": "ALT text present"
-            })
+            issues.append(CheckResult("alt_text", "pass", "ALT text present"))
     
     if not issues:
-        issues.append({
-            "test_name": "alt_text",
-            "status": "pass",
-            "details": "No images found, ALT text check passed"
-        })
+        issues.append(CheckResult("alt_text", "pass", "No images found, ALT text check passed"))
     
     return issues
 
 
 def check_links(html_content: str) -> List[Dict[str, Any]]:
     """Check for broken or malformed links"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    links = soup.find_all('a', href=True)
+    return _as_dicts(_check_links(_parse_if_tag(html_content, _LINK_TAG_RE)))
+
+
+def _check_links(tree: lxml.html.HtmlElement) -> List[CheckResult]:
+    """check_links on an already parsed document"""
+    links = _LINK_XPATH(tree)
     
     issues = []
     for link in links:
-        href = link['href']
+        href = link.get('href')
+        scheme = _VALID_SCHEME_RE.match(href)
         # Check for malformed URLs
-        if not href.startswith(('http://', 'https://', 'mailto:', '#')):
-            issues.append({
-                "test_name": "links",
-                "status": "fail",
-                "details": f"Malformed link: {href}"
-            })
+        if not scheme:
+            issues.append(CheckResult("links", "fail", f"Malformed link: {href}"))
         else:
             # For HTTP/HTTPS links, perform additional checks
-            if href.startswith(('http://', 'https://')):
+            if scheme.group(1):
                 # Check for common patterns that indicate potential issues
                 problems = []
                 
@@ -78,7 +142,6 @@ def check_links(html_content: str) -> List[Dict[str, Any]]:
                     problems.append("malformed query parameters")
                 
                 # Check for unencoded special characters
-                import urllib.parse
                 try:
                     parsed = urllib.parse.urlparse(href)
                     # Check if URL can be properly parsed
@@ -88,154 +151,98 @@ def check_links(html_content: str) -> List[Dict[str, Any]]:
                     problems.append("URL parsing failed")
                 
                 if problems:
-                    issues.append({
-                        "test_name": "broken_links",
-                        "status": "fail",
-                        "details": f"Potentially broken link: {href} (issues: {', '.join(problems)})"
-                    })
+                    issues.append(CheckResult(
+                        "broken_links",
+                        "fail",
+                        f"Potentially broken link: {href} (issues: {', '.join(problems)})"
+                    ))
                 else:
-                    issues.append({
-                        "test_name": "links",
-                        "status": "pass",
-                        "details": f"Valid link format: {href}"
-                    })
+                    issues.append(CheckResult("links", "pass", f"Valid link format: {href}"))
             else:
                 # For mailto and anchor links, just mark as pass
-                issues.append({
-                    "test_name": "links",
-                    "status": "pass",
-                    "details": f"Valid link: {href}"
-                })
+                issues.append(CheckResult("links", "pass", f"Valid link: {href}"))
     
     if not issues:
-        issues.append({
-            "test_name": "links",
-            "status": "pass",
-            "details": "No links found, link check passed"
-        })
+        issues.append(CheckResult("links", "pass", "No links found, link check passed"))
     
     return issues
 
 
 def check_subject_line(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Check for missing subject line"""
-    subject = metadata.get('subject', '')
-    
-    if not subject or subject.strip() == '':
-        return [{
-            "test_name": "subject_line",
-            "status": "fail",
-            "details": "Missing subject line"
-        }]
-    else:
-        return [{
-            "test_name": "subject_line",
-            "status": "pass",
-            "details": f"Subject line present: {subject}"
-        }]
+    return _as_dicts(_check_metadata(metadata, _META_CHECKS[:1]))
 
 
 def check_preheader(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Check for missing preheader"""
-    preheader = metadata.get('preheader', '')
-    
-    if not preheader or preheader.strip() == '':
-        return [{
-            "test_name": "preheader",
-            "status": "fail",
-            "details": "Missing preheader"
-        }]
-    else:
-        return [{
-            "test_name": "preheader",
-            "status": "pass",
-            "details": "Preheader present"
-        }]
+    return _as_dicts(_check_metadata(metadata, _META_CHECKS[1:2]))
 
 
 def check_template_meta(metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Check template metadata (name, locale)"""
+    return _as_dicts(_check_metadata(metadata, _META_CHECKS[2:]))
+
+
+def _check_metadata(metadata: Dict[str, Any],
+                    checks: Tuple[Tuple[str, str, str, str], ...] = _META_CHECKS) -> List[CheckResult]:
+    """Check that each metadata field in checks is present and not blank"""
     issues = []
-    
-    template_name = metadata.get('template_name', '')
-    if not template_name or template_name.strip() == '':
-        issues.append({
-            "test_name": "template_meta",
-            "status": "fail",
-            "details": "Missing template name"
-        })
-    else:
-        issues.append({
-            "test_name": "template_meta",
-            "status": "pass",
-            "details": f"Template name present: {template_name}"
-        })
-    
-    locale = metadata.get('locale', '')
-    if not locale or locale.strip() == '':
-        issues.append({
-            "test_name": "template_meta",
-            "status": "fail",
-            "details": "Missing locale"
-        })
-    else:
-        issues.append({
-            "test_name": "template_meta",
-            "status": "pass",
-            "details": f"Locale present: {locale}"
-        })
+    for key, test_name, missing_details, present_details in checks:
+        value = metadata.get(key, '')
+        if not value or value.strip() == '':
+            issues.append(CheckResult(test_name, "fail", missing_details))
+        else:
+            issues.append(CheckResult(test_name, "pass", present_details.format(value)))
     
     return issues
 
 
 def check_width(html_content: str) -> List[Dict[str, Any]]:
     """Check for width mismatch"""
+    return _as_dicts(_check_width(html_content.lower()))
+
+
+def _check_width(html_lower: str) -> List[CheckResult]:
+    """check_width on the lowercased HTML (attribute names are case-insensitive)"""
     # This is a simplified check - in practice, this would be more complex
     # depending on the email framework being used
     issues = []
     
     # Look for common width attributes
-    if 'width=' not in html_content and 'style=' not in html_content:
-        issues.append({
-            "test_name": "width",
-            "status": "fail",
-            "details": "No width attributes found in email"
-        })
+    if 'width=' not in html_lower and 'style=' not in html_lower:
+        issues.append(CheckResult("width", "fail", "No width attributes found in email"))
     else:
-        issues.append({
-            "test_name": "width",
-            "status": "pass",
-            "details": "Width attributes found"
-        })
+        issues.append(CheckResult("width", "pass", "Width attributes found"))
     
     return issues
 
 
 def check_background_color(html_content: str) -> List[Dict[str, Any]]:
     """Check for background color mismatch"""
+    return _as_dicts(_check_background_color(html_content.lower()))
+
+
+def _check_background_color(html_lower: str) -> List[CheckResult]:
+    """check_background_color on the lowercased HTML (CSS properties and attributes are case-insensitive)"""
     issues = []
     
     # Simple check for background color declarations
-    if 'background-color:' not in html_content and 'bgcolor=' not in html_content:
-        issues.append({
-            "test_name": "background_color",
-            "status": "fail",
-            "details": "No background color declarations found"
-        })
+    if 'background-color:' not in html_lower and 'bgcolor=' not in html_lower:
+        issues.append(CheckResult("background_color", "fail", "No background color declarations found"))
     else:
-        issues.append({
-            "test_name": "background_color",
-            "status": "pass",
-            "details": "Background color declarations found"
-        })
+        issues.append(CheckResult("background_color", "pass", "Background color declarations found"))
     
     return issues
 
 
 def check_image_dimensions(html_content: str) -> List[Dict[str, Any]]:
     """Check for missing image dimensions"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    images = soup.find_all('img')
+    return _as_dicts(_check_image_dimensions(_parse_if_tag(html_content, _IMG_TAG_RE)))
+
+
+def _check_image_dimensions(tree: lxml.html.HtmlElement) -> List[CheckResult]:
+    """check_image_dimensions on an already parsed document"""
+    images = _IMG_XPATH(tree)
     
     issues = []
     for img in images:
@@ -243,78 +250,108 @@ def check_image_dimensions(html_content: str) -> List[Dict[str, Any]]:
         height = img.get('height')
         
         if not width and not height:
-            issues.append({
-                "test_name": "image_dimensions",
-                "status": "fail",
-                "details": f"Image missing dimensions: {img}"
-            })
+            issues.append(CheckResult("image_dimensions", "fail", f"Image missing dimensions: {_image_source(img)}"))
         else:
-            issues.append({
-                "test_name": "image_dimensions",
-                "status": "pass",
-                "details": "Image dimensions present"
-            })
+            issues.append(CheckResult("image_dimensions", "pass", "Image dimensions present"))
     
     if not issues:
-        issues.append({
-            "test_name": "image_dimensions",
-            "status": "pass",
-            "details": "No images found, dimension check passed"
-        })
+        issues.append(CheckResult("image_dimensions", "pass", "No images found, dimension check passed"))
     
     return issues
 
 
 def check_long_copy(html_content: str) -> List[Dict[str, Any]]:
     """Check for long text lines (>200 chars)"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    # Get all text content
-    text_elements = soup.find_all(string=True)
+    return _as_dicts(_check_long_copy(parse_html(html_content)))
+
+
+def _check_long_copy(tree: lxml.html.HtmlElement) -> List[CheckResult]:
+    """check_long_copy on an already parsed document"""
+    # Get text content long enough to fail once stripped
+    text_elements = _LONG_TEXT_XPATH(tree)
     
     issues = []
-    for i, text in enumerate(text_elements):
+    for node in text_elements:
+        if isinstance(node, str):
+            text = node
+            # Tail text belongs to the element enclosing the one it trails
+            parent_element = node.getparent()
+            if node.is_tail and parent_element is not None:
+                parent_element = parent_element.getparent()
+        else:
+            # Comment node
+            text = node.text or ''
+            parent_element = node.getparent()
+        
         # Skip whitespace-only text
         if text.strip() and len(text.strip()) > 200:
             # Try to get context by finding the parent element
             parent_context = ""
             try:
                 # Get a snippet of the surrounding HTML
-                parent_element = text.parent
-                if parent_element:
-                    parent_context = str(parent_element)[:100] + "..." if len(str(parent_element)) > 100 else str(parent_element)
-            except:
+                if parent_element is not None:
+                    parent_html = _to_html(parent_element)
+                    parent_context = parent_html[:100] + "..." if len(parent_html) > 100 else parent_html
+            except Exception:
                 pass
             
-            issues.append({
-                "test_name": "long_copy",
-                "status": "fail",
-                "details": f"Long text line found ({len(text.strip())} chars). Consider breaking into shorter paragraphs (<150 chars). Context: {parent_context}"
-            })
+            issues.append(CheckResult(
+                "long_copy",
+                "fail",
+                f"Long text line found ({len(text.strip())} chars). Consider breaking into shorter paragraphs (<150 chars). Context: {parent_context}"
+            ))
     
     if not issues:
-        issues.append({
-            "test_name": "long_copy",
-            "status": "pass",
-            "details": "No excessively long text lines found (all <200 characters)"
-        })
+        issues.append(CheckResult("long_copy", "pass", "No excessively long text lines found (all <200 characters)"))
     
     return issues
 
 
+def clear_cache() -> None:
+    """Drop cached check results"""
+    _html_results.clear()
+
+
+def _html_check_results(html_content: str,
+                        tree: Optional[lxml.html.HtmlElement]) -> Tuple[Tuple[CheckResult, ...], ...]:
+    """Cached (alt_text, links, width, background_color, image_dimensions, long_copy) results"""
+    cache_key = content_digest(html_content)
+    results = _html_results.get(cache_key)
+    if results is None:
+        # Parse once and share the tree across the DOM checks
+        if tree is None:
+            tree = parse_html(html_content)
+        # Lowercase once for the substring checks
+        html_lower = html_content.lower()
+        results = tuple(tuple(issues) for issues in (
+            _check_alt_text(tree),
+            _check_links(tree),
+            _check_width(html_lower),
+            _check_background_color(html_lower),
+            _check_image_dimensions(tree),
+            _check_long_copy(tree)
+        ))
+        _html_results.put(cache_key, results)
+    return results
+
+
 # Main function to run all deterministic tests
-def run_all_deterministic_tests(html_content: str, metadata: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Run all deterministic tests and return consolidated results"""
-    all_issues = []
+def run_all_deterministic_tests(html_content: str, metadata: Dict[str, Any],
+                                tree: Optional[lxml.html.HtmlElement] = None) -> List[Dict[str, Any]]:
+    """Run all deterministic tests and return consolidated results
     
-    # Run each test
-    all_issues.extend(check_alt_text(html_content))
-    all_issues.extend(check_links(html_content))
-    all_issues.extend(check_subject_line(metadata))
-    all_issues.extend(check_preheader(metadata))
-    all_issues.extend(check_template_meta(metadata))
-    all_issues.extend(check_width(html_content))
-    all_issues.extend(check_background_color(html_content))
-    all_issues.extend(check_image_dimensions(html_content))
-    all_issues.extend(check_long_copy(html_content))
+    tree may be the document already parsed with html_utils.parse_html (it is not modified).
+    """
+    # HTML checks come from the cache when this HTML was checked before
+    alt_text, links, width, background_color, image_dimensions, long_copy = _html_check_results(html_content, tree)
     
-    return all_issues
\ No newline at end of file
+    # Run each test, building the consolidated list in one pass
+    return _as_dicts(chain(
+        alt_text,
+        links,
+        _check_metadata(metadata),
+        width,
+        background_color,
+        image_dimensions,
+        long_copy
+    ))
\ No newline at end of file
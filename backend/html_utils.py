@@ -0,0 +1,34 @@
+"""
+HTML parsing helpers for the Email QA Agentic Platform
+Parses email HTML once so the tree can be shared across agents
+"""
+
+from typing import Dict, Iterable, List
+from lxml import etree
+import lxml.html
+
+
+# Elements the agents look up by tag, collected once per email
+INDEXED_TAGS = ('img', 'a', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'li')
+
+
+def parse_html(html_content: str) -> lxml.html.HtmlElement:
+    """Parse HTML into an lxml tree, tolerating empty documents"""
+    try:
+        return lxml.html.fromstring(html_content)
+    except ValueError:
+        # lxml rejects str input that carries an XML encoding declaration
+        return lxml.html.fromstring(html_content.encode('utf-8'))
+    except etree.ParserError:
+        # Empty or comment-only documents have no root element
+        return lxml.html.Element('html')
+
+
+def index_elements(tree: lxml.html.HtmlElement,
+                   tags: Iterable[str] = INDEXED_TAGS) -> Dict[str, List[lxml.html.HtmlElement]]:
+    """Bucket the elements with the given tags by tag name in a single tree walk"""
+    tags = tuple(tags)
+    index: Dict[str, List[lxml.html.HtmlElement]] = {tag: [] for tag in tags}
+    for element in tree.iter(*tags):
+        index[element.tag].append(element)
+    return index
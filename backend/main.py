@@ -1,17 +1,55 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse
 import uvicorn
-from api.endpoints import router as api_router
+from api.endpoints import (
+    router as api_router, email_connector, shutdown_qa_workers, fail_interrupted_qa_jobs, cancel_qa_jobs
+)
+from agents.risk_scoring_agent import invalidate_weights
 import os
 from database import init_db
 
-# Create uploads directory if it doesn't exist
-os.makedirs("uploads", exist_ok=True)
+# Set once the uploads directory and database tables exist (startup work runs once per process)
+_INIT_DONE = False
+
+def _initialize() -> None:
+    """Create the uploads directory and database tables (idempotent)"""
+    global _INIT_DONE
+    if _INIT_DONE:
+        return
+    
+    # Create uploads directory if it doesn't exist
+    os.makedirs("uploads", exist_ok=True)
+    
+    # Initialize database
+    init_db.init_db()
+    _INIT_DONE = True
 
-# Initialize database
-init_db.init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize storage and seed default rules at startup (not at import), keeping GET /rules a single SELECT"""
+    await run_in_threadpool(_initialize)
+    if await init_db.seed_default_rules():
+        invalidate_weights()
+    # Jobs still pending from a previous run will never finish
+    await fail_interrupted_qa_jobs()
+    yield
+    # Cancel background QA jobs, recording them as failed
+    await cancel_qa_jobs()
+    # Release pooled Email on Acid connections
+    if email_connector:
+        await email_connector.aclose()
+    # Stop QA worker processes
+    shutdown_qa_workers()
 
-app = FastAPI(title="Email QA Agentic Platform", version="1.0.0")
+app = FastAPI(
+    title="Email QA Agentic Platform",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
 
 # CORS middleware
 app.add_middleware(
@@ -25,13 +63,20 @@ app.add_middleware(
 # Include API routes
 app.include_router(api_router, prefix="/api/v1")
 
+# Static bodies, rendered to bytes once at import
+_ROOT_RESPONSE = JSONResponse(
+    {"message": "Email QA Agentic Platform API"},
+    headers={"Cache-Control": "public, max-age=3600"}
+)
+_HEALTH_RESPONSE = JSONResponse({"status": "healthy"})
+
 @app.get("/")
 async def root():
-    return {"message": "Email QA Agentic Platform API"}
+    return _ROOT_RESPONSE
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return _HEALTH_RESPONSE
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8003)
\ No newline at end of file
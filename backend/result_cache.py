@@ -0,0 +1,64 @@
+"""
+Result caching helpers for the Email QA Agentic Platform
+Bounded, thread-safe memoization keyed by content digests
+"""
+
+from typing import Any, Hashable, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+
+
+def content_digest(value: Any) -> str:
+    """Stable 128-bit blake2b digest of a JSON-serializable structure"""
+    if isinstance(value, str):
+        payload = value.encode("utf-8")
+    else:
+        payload = json.dumps(value, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """Least-recently-used cache shared across threads, evicting beyond maxsize entries
+    
+    With ttl (seconds), entries also expire that long after they were stored.
+    """
+    
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expiry deadline on the monotonic clock or None, value)
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value for key (marking it recently used) or default"""
+        with self._lock:
+            try:
+                self._entries.move_to_end(key)
+            except KeyError:
+                return default
+            deadline, value = self._entries[key]
+            if deadline is not None and time.monotonic() >= deadline:
+                del self._entries[key]
+                return default
+            return value
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry when full"""
+        deadline = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (deadline, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -2,6 +2,9 @@
 Test runner for the Email QA Agentic Platform
 """
 
+from typing import Iterator, List, Optional
+import hashlib
+import json
 import unittest
 import sys
 import os
@@ -9,11 +12,79 @@ import os
 # Add the backend directory to the path so we can import modules
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+# Discovered test ids, reused while the tests tree is unchanged
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'tests.manifest')
+
+
+def _tree_digest(start_dir: str) -> str:
+    """Digest of the file names, sizes and mtimes under start_dir"""
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(start_dir):
+        dirnames[:] = sorted(d for d in dirnames if d != '__pycache__')
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            stat = os.stat(path)
+            entries.append((os.path.relpath(path, start_dir), stat.st_size, stat.st_mtime_ns))
+    payload = json.dumps([os.path.abspath(start_dir), entries]).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _iter_tests(suite: unittest.TestSuite) -> Iterator[unittest.TestCase]:
+    """Yield the individual test cases in a (nested) suite"""
+    for test in suite:
+        if isinstance(test, unittest.TestSuite):
+            yield from _iter_tests(test)
+        else:
+            yield test
+
+
+def _read_manifest(digest: str) -> Optional[List[str]]:
+    """Cached test ids for this tests tree digest, if any"""
+    try:
+        with open(MANIFEST_PATH, encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+    return manifest.get('test_ids') if manifest.get('digest') == digest else None
+
+
+def _write_manifest(digest: str, test_ids: List[str]) -> None:
+    """Store the discovered test ids (best effort; a read-only checkout just skips the cache)"""
+    try:
+        os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+        with open(MANIFEST_PATH, 'w', encoding='utf-8') as manifest_file:
+            json.dump({'digest': digest, 'test_ids': test_ids}, manifest_file)
+    except OSError:
+        pass
+
+
+def load_tests_cached(loader: unittest.TestLoader, start_dir: str) -> unittest.TestSuite:
+    """
+    Discover the tests under start_dir, reusing the cached test ids while the tree is unchanged
+    
+    A cache hit loads the recorded ids by name, skipping the discovery walk.
+    """
+    digest = _tree_digest(start_dir)
+    test_ids = _read_manifest(digest)
+    if test_ids:
+        # discover() puts the top-level directory on the path; do the same for the names
+        top_level_dir = os.path.abspath(start_dir)
+        if top_level_dir not in sys.path:
+            sys.path.insert(0, top_level_dir)
+        return loader.loadTestsFromNames(test_ids)
+    
+    suite = loader.discover(start_dir)
+    # Never cache a discovery that hit import errors
+    if not loader.errors:
+        _write_manifest(digest, [test.id() for test in _iter_tests(suite)])
+    return suite
+
+
 if __name__ == '__main__':
     # Discover and run tests
     loader = unittest.TestLoader()
     start_dir = 'tests'
-    suite = loader.discover(start_dir)
+    suite = load_tests_cached(loader, start_dir)
     
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
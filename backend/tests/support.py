@@ -0,0 +1,41 @@
+"""
+Shared setup for tests that touch the API or the database
+Import this before any backend module that reads the environment (database.config, api.endpoints)
+"""
+
+import atexit
+import os
+import shutil
+import tempfile
+
+# Throwaway SQLite database, so tests never touch a configured development database
+_DB_DIR = tempfile.mkdtemp(prefix="email-qa-tests-")
+atexit.register(shutil.rmtree, _DB_DIR, True)
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(_DB_DIR, "test.db")
+os.environ["EMAIL_ON_ACID_API_KEY"] = "test-key"
+os.environ["EMAIL_ON_ACID_API_SECRET"] = "test-secret"
+# Run QA in-process so tests need no worker processes
+os.environ["QA_WORKER_PROCESSES"] = "0"
+
+
+def create_test_app():
+    """FastAPI app serving the API router at /api/v1 on freshly created tables
+    
+    Its lifespan runs the same QA job startup and shutdown hooks as main.app.
+    """
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI
+    from api.endpoints import router, cancel_qa_jobs, fail_interrupted_qa_jobs
+    from database import init_db
+    
+    @asynccontextmanager
+    async def lifespan(app):
+        await fail_interrupted_qa_jobs()
+        yield
+        await cancel_qa_jobs()
+    
+    init_db.init_db()
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(router, prefix="/api/v1")
+    return app
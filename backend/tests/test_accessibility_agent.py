@@ -0,0 +1,91 @@
+"""
+Unit tests for the accessibility agent
+"""
+
+import unittest
+from unittest import mock
+from agents.accessibility_agent import AccessibilityAgent, _STREAM_THRESHOLD, _contrast_ratio, _pack_hex
+from html_utils import parse_html
+
+# One block of every element kind the accessibility checks classify
+_BLOCK = """
+<h2>Section {i}</h2>
+<img src="/a{i}.png">
+<img src="/b{i}.png" alt="photo">
+<img src="/c{i}.png" alt="{long_alt}">
+<img src="/d{i}.png" alt="Product shot {i}">
+<a href="/x{i}">click here</a>
+<a href="/y{i}"><span>Shop the <b>spring</b> range {i}</span></a>
+<a href="/z{i}"><img src="/icon{i}.png" alt=""></a>
+<a name="anchor{i}">no href</a>
+<a href="/long{i}">{long_text}</a>
+<li>Orphan item {i}</li>
+<p style="color: #777; background-color: #fff">Grey copy {i}</p>
+"""
+
+
+class TestColorContrast(unittest.TestCase):
+    
+    def setUp(self):
+        self.agent = AccessibilityAgent()
+    
+    def test_pack_hex_short_form(self):
+        """Test #RGB colors expand to the same value as #RRGGBB"""
+        self.assertEqual(_pack_hex("abc"), 0xAABBCC)
+        self.assertEqual(_pack_hex("abc"), _pack_hex("AABBCC"))
+        self.assertEqual(_pack_hex("fff"), 0xFFFFFF)
+    
+    def test_contrast_ratio_black_on_white(self):
+        """Test black on white has the maximum contrast ratio of 21:1"""
+        self.assertAlmostEqual(_contrast_ratio(_pack_hex("000"), _pack_hex("fff")), 21.0)
+        self.assertAlmostEqual(_contrast_ratio(_pack_hex("fff"), _pack_hex("000")), 21.0)
+    
+    def test_contrast_ratio_grey_on_white(self):
+        """Test #777 on white is just below the WCAG AA minimum"""
+        self.assertAlmostEqual(_contrast_ratio(_pack_hex("777777"), _pack_hex("ffffff")), 4.48, places=2)
+    
+    def test_contrast_ratio_same_color(self):
+        """Test a color against itself has the minimum contrast ratio of 1:1"""
+        self.assertAlmostEqual(_contrast_ratio(_pack_hex("abc"), _pack_hex("aabbcc")), 1.0)
+    
+    def test_low_contrast_style_flagged(self):
+        """Test an inline style with insufficient contrast is reported once per color pair"""
+        html = ('<p style="color: #777; background-color: #fff">One</p>'
+                '<p style="color:#777777;background:#FFFFFF">Two</p>')
+        issues = self.agent._check_color_contrast(html)
+        self.assertEqual(len(issues), 1)
+        self.assertIn("4.48:1", issues[0]["description"])
+        self.assertIn("#777777 text and #ffffff background", issues[0]["description"])
+    
+    def test_sufficient_contrast_style_passes(self):
+        """Test an inline style with sufficient contrast is not reported"""
+        html = '<p style="color: #000; background-color: #fff">Readable</p>'
+        self.assertEqual(self.agent._check_color_contrast(html), [])
+
+
+
+class TestStreamingScan(unittest.TestCase):
+    
+    def test_streaming_matches_tree_path(self):
+        """Test a large email yields the same issues streamed as from a parsed tree"""
+        blocks = []
+        i = 0
+        while sum(map(len, blocks)) <= _STREAM_THRESHOLD:
+            blocks.append(_BLOCK.format(i=i, long_alt="a" * 130, long_text="word " * 20))
+            i += 1
+        html = "<html><body><h1>Title</h1><h1>Second</h1>" + "".join(blocks) + "</body></html>"
+        self.assertGreater(len(html), _STREAM_THRESHOLD)
+        
+        agent = AccessibilityAgent()
+        with mock.patch.object(agent, "_scan_streaming", wraps=agent._scan_streaming) as scan:
+            streamed = agent.analyze("large", html, {})
+        scan.assert_called_once()
+        from_tree = agent.analyze("large", html, {}, parsed_tree=parse_html(html))
+        
+        self.assertEqual(streamed["issues"], from_tree["issues"])
+        # Every image and link rule fires for every block
+        self.assertGreater(len(streamed["issues"]), 6 * len(blocks))
+
+
+if __name__ == '__main__':
+    unittest.main()
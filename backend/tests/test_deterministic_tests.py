@@ -6,7 +6,8 @@ import unittest
 from deterministic_tests import (
     check_alt_text, check_links, check_subject_line, 
     check_preheader, check_template_meta, check_width,
-    check_background_color, check_image_dimensions, check_long_copy
+    check_background_color, check_image_dimensions, check_long_copy,
+    run_all_deterministic_tests
 )
 
 
@@ -28,11 +29,19 @@ class TestDeterministicTests(unittest.TestCase):
     
     def test_check_links_pass(self):
         """Test links check passes with valid links"""
-        html = '<a href="https://example.com">Valid Link</a>'
+        html = '<a href="https://www.brand.com">Valid Link</a>'
         results = check_links(html)
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['status'], 'pass')
     
+    def test_check_links_placeholder_domain(self):
+        """Test links check flags placeholder domains as broken"""
+        html = '<a href="https://example.com">Placeholder Link</a>'
+        results = check_links(html)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['test_name'], 'broken_links')
+        self.assertEqual(results[0]['status'], 'fail')
+    
     def test_check_links_fail(self):
         """Test links check fails with malformed links"""
         html = '<a href="javascript:alert()">Invalid Link</a>'
@@ -40,6 +49,12 @@ class TestDeterministicTests(unittest.TestCase):
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['status'], 'fail')
     
+    def test_check_links_uppercase_scheme(self):
+        """Test links check accepts URL schemes regardless of case"""
+        html = '<a href="HTTPS://brand.com/offer">Valid Link</a><a href="MAILTO:team@brand.com">Mail</a>'
+        results = check_links(html)
+        self.assertEqual([result['status'] for result in results], ['pass', 'pass'])
+    
     def test_check_subject_line_pass(self):
         """Test subject line check passes when subject is present"""
         metadata = {'subject': 'Test Subject'}
@@ -67,6 +82,17 @@ class TestDeterministicTests(unittest.TestCase):
         results = check_preheader(metadata)
         self.assertEqual(len(results), 1)
         self.assertEqual(results[0]['status'], 'fail')
+    
+    def test_width_and_background_color_ignore_case(self):
+        """Test width and background color checks accept uppercase attributes"""
+        html = '<TABLE WIDTH="600" BGCOLOR="#FFFFFF"><TR><TD>Legacy markup</TD></TR></TABLE>'
+        self.assertEqual(check_width(html)[0]['status'], 'pass')
+        self.assertEqual(check_background_color(html)[0]['status'], 'pass')
+        
+        results = run_all_deterministic_tests(html, {})
+        statuses = {result['test_name']: result['status'] for result in results}
+        self.assertEqual(statuses['width'], 'pass')
+        self.assertEqual(statuses['background_color'], 'pass')
 
 
 if __name__ == '__main__':
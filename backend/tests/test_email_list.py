@@ -0,0 +1,42 @@
+"""
+Unit tests for GET /emails
+"""
+
+import support
+import unittest
+from datetime import datetime
+from fastapi.testclient import TestClient
+from database.config import SessionLocal
+from database.models import EmailTemplate, QAReport
+
+
+class TestEmailList(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.client = TestClient(support.create_test_app())
+    
+    def test_risk_score_is_from_latest_report(self):
+        """Test each template is listed once with the risk score of its newest report"""
+        db = SessionLocal()
+        try:
+            db.add(EmailTemplate(id="tmpl-latest", name="Latest", status="processed", metadata_json={"locale": "en-GB"}))
+            # Oldest report inserted (and keyed) first, so insertion order would pick it
+            db.add(QAReport(id="report-a", email_template_id="tmpl-latest", risk_score=10,
+                            created_at=datetime(2024, 5, 1, 12, 0, 0)))
+            db.add(QAReport(id="report-b", email_template_id="tmpl-latest", risk_score=80,
+                            created_at=datetime(2024, 5, 2, 12, 0, 0)))
+            db.commit()
+        finally:
+            db.close()
+        
+        response = self.client.get("/api/v1/emails")
+        self.assertEqual(response.status_code, 200)
+        listed = [email for email in response.json() if email["id"] == "tmpl-latest"]
+        self.assertEqual(len(listed), 1)
+        self.assertEqual(listed[0]["risk_score"], 80)
+        self.assertEqual(listed[0]["locale"], "en-GB")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+"""
+Unit tests for the fix suggestion agent
+"""
+
+import unittest
+from agents.fix_suggestion_agent import FixSuggestionAgent
+from agents.issues import collect_all_issues
+
+ALL_AGENT_RESULTS = {
+    "deterministic": [
+        {"test_name": "links", "status": "fail", "details": "Malformed link", "url": "htp://bad"},
+        {"test_name": "width", "status": "pass", "details": "Width set"},
+    ],
+    "compliance": {"issues": [
+        {"rule": "font_compliance", "severity": "low", "description": "Wrong font"},
+        {"rule": "legal_footer", "severity": "critical", "description": "Missing unsubscribe link"},
+    ]},
+    "tone": {"issues": [{"rule": "clarity", "severity": "medium", "description": "Passive voice"}]},
+    "accessibility": {"issues": [
+        {"rule": "alt_text_quality", "severity": "medium", "description": "Bad ALT", "current_text": "photo"},
+    ]},
+}
+
+
+class TestFixSuggestionAgent(unittest.TestCase):
+    
+    def setUp(self):
+        self.agent = FixSuggestionAgent()
+    
+    def test_fixes_ordered_by_priority(self):
+        """Test fixes are ordered by priority, keeping walk order within a priority"""
+        fixes = self.agent.generate_fixes(ALL_AGENT_RESULTS)
+        self.assertEqual([fix["issue"] for fix in fixes],
+                         ["legal_footer", "links", "clarity", "alt_text_quality", "font_compliance"])
+    
+    def test_templates_filled_from_issue_and_defaults(self):
+        """Test suggestions use issue fields, falling back to template defaults"""
+        suggestions = {fix["issue"]: fix["suggestion"] for fix in self.agent.generate_fixes(ALL_AGENT_RESULTS)}
+        self.assertEqual(suggestions["links"], "Fix malformed link: htp://bad")
+        self.assertEqual(suggestions["alt_text_quality"], "Improve ALT text descriptiveness: photo")
+        self.assertEqual(suggestions["font_compliance"], "Update font family to brand standard: Arial")
+        self.assertEqual(suggestions["legal_footer"], "Fix compliance issue: Missing unsubscribe link")
+    
+    def test_prewalked_issues_match_internal_walk(self):
+        """Test passing the pre-walked issues gives the same fixes as walking them here"""
+        issues = collect_all_issues(ALL_AGENT_RESULTS)
+        self.assertEqual(self.agent.generate_fixes(ALL_AGENT_RESULTS, issues),
+                         self.agent.generate_fixes(ALL_AGENT_RESULTS))
+    
+    def test_fixes_are_independent_per_call(self):
+        """Test mutating returned fixes does not affect later calls"""
+        first = self.agent.generate_fixes(ALL_AGENT_RESULTS)
+        first[0]["suggestion"] = "changed"
+        first.clear()
+        second = self.agent.generate_fixes(ALL_AGENT_RESULTS)
+        self.assertEqual(len(second), 5)
+        self.assertEqual(second[0]["suggestion"], "Fix compliance issue: Missing unsubscribe link")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+"""
+Unit tests for the HTML parsing helpers
+"""
+
+import unittest
+from html_utils import index_elements, parse_html
+
+
+class TestParseHtml(unittest.TestCase):
+    
+    def test_parse_html(self):
+        """Test ordinary HTML parses into a tree"""
+        tree = parse_html('<html><body><h1>Title</h1></body></html>')
+        self.assertEqual(tree.tag, 'html')
+        self.assertEqual(tree.findtext('.//h1'), 'Title')
+    
+    def test_encoding_declaration_falls_back_to_bytes(self):
+        """Test str input with an XML encoding declaration is parsed from bytes"""
+        html = '<?xml version="1.0" encoding="utf-8"?><html><body><p>Café</p></body></html>'
+        tree = parse_html(html)
+        self.assertEqual(tree.text_content(), 'Café')
+    
+    def test_empty_documents_give_empty_root(self):
+        """Test empty and comment-only documents give an empty html element"""
+        for html in ('', '   ', '<!-- nothing here -->'):
+            with self.subTest(html=html):
+                tree = parse_html(html)
+                self.assertEqual(tree.tag, 'html')
+                self.assertEqual(len(tree), 0)
+
+
+class TestIndexElements(unittest.TestCase):
+    
+    def test_index_elements_buckets_by_tag(self):
+        """Test elements are bucketed per requested tag in document order"""
+        tree = parse_html('<div><a href="/1">1</a><img src="x.png"><p><a href="/2">2</a></p></div>')
+        index = index_elements(tree, ('a', 'img', 'h1'))
+        self.assertEqual([link.get('href') for link in index['a']], ['/1', '/2'])
+        self.assertEqual(len(index['img']), 1)
+        self.assertEqual(index['h1'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Unit tests for primary key generation
+"""
+
+import time
+import unittest
+import uuid
+from unittest import mock
+from database import ids
+from database.ids import uuid7
+
+
+class TestUUID7(unittest.TestCase):
+    
+    def test_version_and_variant(self):
+        """Test ids carry the version 7 and RFC 4122 variant bits"""
+        for _ in range(100):
+            value = uuid7()
+            self.assertEqual(value.version, 7)
+            self.assertEqual(value.variant, uuid.RFC_4122)
+    
+    def test_timestamp_is_unix_milliseconds(self):
+        """Test the leading 48 bits hold the creation time in Unix milliseconds"""
+        before = time.time_ns() // 1_000_000
+        value = uuid7()
+        after = time.time_ns() // 1_000_000
+        self.assertTrue(before <= value.int >> 80 <= after + 1)
+    
+    def test_ids_sort_in_creation_order(self):
+        """Test successive ids sort in creation order, also as hex strings"""
+        values = [uuid7() for _ in range(10000)]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual([value.hex for value in values], sorted(value.hex for value in values))
+    
+    def test_unique_and_ordered_within_one_millisecond(self):
+        """Test ids made in the same millisecond are unique and ordered, past the sequence limit"""
+        frozen_ns = (time.time_ns() // 1_000_000 + 1000) * 1_000_000
+        # Module state is restored afterwards so later ids follow the real clock
+        with mock.patch.object(ids.time, "time_ns", return_value=frozen_ns), \
+                mock.patch.multiple(ids, _last_ms=ids._last_ms, _sequence=ids._sequence):
+            values = [uuid7() for _ in range(ids._SEQUENCE_MAX + 100)]
+        self.assertEqual(len(set(values)), len(values))
+        self.assertEqual(values, sorted(values))
+        # Exhausting the sequence borrows the following millisecond instead of repeating ids
+        self.assertGreater(values[-1].int >> 80, frozen_ns // 1_000_000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Unit tests for the issue traversal helpers
+"""
+
+import unittest
+from agents.issues import Issue, IssueSummary, collect_all_issues, summarize_issues
+
+ALL_AGENT_RESULTS = {
+    "accessibility": {"issues": [{"description": "Bad ALT"}]},
+    "deterministic": [
+        {"test_name": "links", "status": "fail", "details": "Malformed link"},
+        {"test_name": "width", "status": "pass", "details": "Width set"},
+    ],
+    "tone": {"issues": [{"rule": "clarity", "severity": "low", "description": "Passive voice"}]},
+    "compliance": {"issues": [{"rule": "legal_footer", "severity": "critical", "description": "No footer"}]},
+}
+
+
+class TestIssues(unittest.TestCase):
+    
+    def test_collect_all_issues_order_and_defaults(self):
+        """Test failed tests come first, then agent issues in category order with defaults filled"""
+        issues = collect_all_issues(ALL_AGENT_RESULTS)
+        self.assertEqual([(issue.category, issue.rule, issue.severity) for issue in issues], [
+            ("deterministic", "links", "high"),
+            ("compliance", "legal_footer", "critical"),
+            ("tone", "clarity", "low"),
+            ("accessibility", "", "medium"),
+        ])
+        self.assertEqual(issues[0].description, "Malformed link")
+        # The source dict is kept for template rendering
+        self.assertIs(issues[0].source, ALL_AGENT_RESULTS["deterministic"][0])
+    
+    def test_collect_all_issues_empty(self):
+        """Test missing agent results yield no issues"""
+        self.assertEqual(collect_all_issues({}), [])
+    
+    def test_summarize_issues(self):
+        """Test the summary counts deterministic failures and detects critical compliance issues"""
+        summary = summarize_issues(collect_all_issues(ALL_AGENT_RESULTS))
+        self.assertEqual(summary, IssueSummary(deterministic_failures=1, critical_compliance=True))
+    
+    def test_summarize_ignores_critical_outside_compliance(self):
+        """Test critical issues from other agents do not count as critical compliance"""
+        issues = [Issue("tone", "spam", "critical", "", {})]
+        self.assertEqual(summarize_issues(issues), IssueSummary(0, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+"""
+Unit tests for the background QA job endpoints
+"""
+
+import support
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+from fastapi.testclient import TestClient
+from api import endpoints
+from database.config import SessionLocal
+from database.models import EmailTemplate, QAJob
+
+SAMPLE_HTML = """
+<html><body><table width="600">
+<tr><td><img src="https://www.brand.com/logo.png" alt="Brand logo"></td></tr>
+<tr><td><a href="https://www.brand.com/offer">View the offer</a></td></tr>
+</table></body></html>
+"""
+
+
+class TestQAJobs(unittest.TestCase):
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.app = support.create_test_app()
+        db = SessionLocal()
+        try:
+            db.add(EmailTemplate(id="tmpl-job", name="Job", status="processed", html_content=SAMPLE_HTML, metadata_json={}))
+            db.commit()
+        finally:
+            db.close()
+    
+    def _poll(self, client, job_id, timeout=30.0):
+        """Poll a job until it leaves the pending state"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = client.get(f"/api/v1/qa/jobs/{job_id}").json()
+            if job["status"] != "pending" or time.monotonic() > deadline:
+                return job
+            time.sleep(0.05)
+    
+    def test_job_pending_then_completed(self):
+        """Test a job is pending while QA runs and then carries the saved report"""
+        release = threading.Event()
+        run_and_save_qa = endpoints._run_and_save_qa
+        
+        async def gated_run_and_save_qa(email_id, db):
+            await asyncio.to_thread(release.wait, 30)
+            return await run_and_save_qa(email_id, db)
+        
+        with mock.patch.object(endpoints, "_run_and_save_qa", gated_run_and_save_qa), TestClient(self.app) as client:
+            response = client.post("/api/v1/emails/tmpl-job/qa/jobs")
+            self.assertEqual(response.status_code, 202)
+            job_id = response.json()["job_id"]
+            self.assertEqual(len(job_id), 32)
+            
+            job = client.get(f"/api/v1/qa/jobs/{job_id}").json()
+            self.assertEqual(job, {"job_id": job_id, "email_id": "tmpl-job", "status": "pending"})
+            
+            release.set()
+            job = self._poll(client, job_id)
+        
+        self.assertEqual(job["status"], "completed")
+        self.assertEqual(job["report"]["email_id"], "tmpl-job")
+        self.assertIn("risk_score", job["report"])
+    
+    def test_job_failed(self):
+        """Test a job whose QA run raises is reported as failed with the error"""
+        async def failing_run_and_save_qa(email_id, db):
+            raise RuntimeError("agent crashed")
+        
+        with mock.patch.object(endpoints, "_run_and_save_qa", failing_run_and_save_qa), TestClient(self.app) as client:
+            job_id = client.post("/api/v1/emails/tmpl-job/qa/jobs").json()["job_id"]
+            job = self._poll(client, job_id)
+        
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "QA process failed: agent crashed")
+        self.assertNotIn("report", job)
+    
+    def test_shutdown_marks_running_job_failed(self):
+        """Test a job still running at shutdown is cancelled and recorded as failed"""
+        started = threading.Event()
+        
+        async def endless_run_and_save_qa(email_id, db):
+            started.set()
+            await asyncio.sleep(3600)
+        
+        with mock.patch.object(endpoints, "_run_and_save_qa", endless_run_and_save_qa):
+            with TestClient(self.app) as client:
+                job_id = client.post("/api/v1/emails/tmpl-job/qa/jobs").json()["job_id"]
+                self.assertTrue(started.wait(10))
+            self.assertEqual(len(endpoints._qa_job_tasks), 0)
+        
+        with TestClient(self.app) as client:
+            job = client.get(f"/api/v1/qa/jobs/{job_id}").json()
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "QA job interrupted by shutdown")
+    
+    def test_startup_fails_stale_pending_jobs(self):
+        """Test jobs left pending by a previous run are marked failed at startup"""
+        db = SessionLocal()
+        try:
+            db.add(QAJob(id="stale-job", email_id="tmpl-job", status="pending"))
+            db.commit()
+        finally:
+            db.close()
+        
+        with TestClient(self.app) as client:
+            job = client.get("/api/v1/qa/jobs/stale-job").json()
+        self.assertEqual(job["status"], "failed")
+        self.assertEqual(job["error"], "QA job interrupted by restart")
+    
+    def test_failed_status_write_is_logged(self):
+        """Test a job whose final status write fails is logged instead of raising"""
+        async def noop_run_and_save_qa(email_id, db):
+            return {}
+        
+        # Patched after startup, whose stale-job sweep also issues an UPDATE
+        with TestClient(self.app) as client, \
+                mock.patch.object(endpoints, "_run_and_save_qa", noop_run_and_save_qa), \
+                mock.patch.object(endpoints, "update", side_effect=RuntimeError("db down")), \
+                mock.patch("builtins.print") as printed:
+            job_id = client.post("/api/v1/emails/tmpl-job/qa/jobs").json()["job_id"]
+            deadline = time.monotonic() + 10
+            while endpoints._qa_job_tasks and time.monotonic() < deadline:
+                time.sleep(0.01)
+            job = client.get(f"/api/v1/qa/jobs/{job_id}").json()
+        
+        self.assertEqual(job["status"], "pending")
+        printed.assert_called_once()
+        self.assertIn(f"Could not record QA job {job_id} as completed: db down", printed.call_args[0][0])
+    
+    def test_unknown_job_not_found(self):
+        """Test polling an unknown job id returns 404"""
+        with TestClient(self.app) as client:
+            response = client.get("/api/v1/qa/jobs/0123456789abcdef0123456789abcdef")
+        self.assertEqual(response.status_code, 404)
+    
+    def test_submissions_bounded(self):
+        """Test submissions beyond the pending job limit are rejected with 503"""
+        with mock.patch.object(endpoints, "_QA_MAX_PENDING_JOBS", 0), TestClient(self.app) as client:
+            response = client.post("/api/v1/emails/tmpl-job/qa/jobs")
+        self.assertEqual(response.status_code, 503)
+
+
+if __name__ == '__main__':
+    unittest.main()
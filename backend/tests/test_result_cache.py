@@ -0,0 +1,75 @@
+"""
+Unit tests for the result caching helpers
+"""
+
+import unittest
+from unittest import mock
+import result_cache
+from result_cache import ResultCache, content_digest
+
+
+class TestResultCache(unittest.TestCase):
+    
+    def test_get_missing_returns_default(self):
+        """Test a missing key returns None or the given default"""
+        cache = ResultCache(maxsize=2)
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.get("missing", "fallback"), "fallback")
+    
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted beyond maxsize"""
+        cache = ResultCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        # Reading "a" makes "b" the least recently used entry
+        self.assertEqual(cache.get("a"), 1)
+        cache.put("c", 3)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+    
+    def test_put_existing_key_replaces_value(self):
+        """Test storing an existing key replaces its value without growing the cache"""
+        cache = ResultCache(maxsize=2)
+        cache.put("a", 1)
+        cache.put("a", 2)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.get("a"), 2)
+    
+    def test_ttl_expiry(self):
+        """Test entries expire ttl seconds after they were stored"""
+        cache = ResultCache(maxsize=2, ttl=10)
+        with mock.patch.object(result_cache.time, "monotonic", return_value=100.0):
+            cache.put("a", 1)
+        with mock.patch.object(result_cache.time, "monotonic", return_value=109.9):
+            self.assertEqual(cache.get("a"), 1)
+        with mock.patch.object(result_cache.time, "monotonic", return_value=110.0):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual(len(cache), 0)
+    
+    def test_clear(self):
+        """Test clear drops every entry"""
+        cache = ResultCache(maxsize=2)
+        cache.put("a", 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache.get("a"))
+
+
+class TestContentDigest(unittest.TestCase):
+    
+    def test_digest_ignores_key_order(self):
+        """Test equal structures digest the same regardless of key order"""
+        self.assertEqual(content_digest({"a": 1, "b": [1, 2]}), content_digest({"b": [1, 2], "a": 1}))
+        self.assertNotEqual(content_digest({"a": 1}), content_digest({"a": 2}))
+    
+    def test_digest_of_string(self):
+        """Test strings digest to 128-bit hex values"""
+        digest = content_digest("<html></html>")
+        self.assertEqual(len(digest), 32)
+        self.assertEqual(digest, content_digest("<html></html>"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+"""
+Unit tests for the RuleConfigResponse model
+"""
+
+import support
+import unittest
+from datetime import datetime
+from api.endpoints import RuleConfigResponse
+
+
+class TestRuleConfigResponse(unittest.TestCase):
+    
+    def _response(self, created_at, updated_at):
+        return RuleConfigResponse.model_validate({
+            "id": "rule-1", "name": "Rule", "description": "", "weight": 1.0, "priority": "medium",
+            "override_enabled": False, "business_override_text": None, "error_message": None,
+            "category": "deterministic", "created_at": created_at, "updated_at": updated_at,
+        })
+    
+    def test_datetimes_are_isoformatted(self):
+        """Test datetime timestamps are serialized to ISO 8601"""
+        response = self._response(datetime(2024, 5, 1, 12, 30), None)
+        self.assertEqual(response.created_at, "2024-05-01T12:30:00")
+        self.assertEqual(response.updated_at, "")
+    
+    def test_strings_pass_through(self):
+        """Test timestamps that are already strings are kept unchanged"""
+        response = self._response("2024-05-01 12:30:00", "")
+        self.assertEqual(response.created_at, "2024-05-01 12:30:00")
+        self.assertEqual(response.updated_at, "")
+
+
+if __name__ == '__main__':
+    unittest.main()
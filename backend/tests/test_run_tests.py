@@ -0,0 +1,100 @@
+"""
+Unit tests for the cached test discovery in run_tests.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+import run_tests
+
+SAMPLE_TESTS = """
+import unittest
+
+
+class TestSample(unittest.TestCase):
+    
+    def test_one(self):
+        pass
+    
+    def test_two(self):
+        pass
+"""
+
+
+class TestManifestCache(unittest.TestCase):
+    
+    def setUp(self):
+        work_dir = tempfile.mkdtemp(prefix="email-qa-discovery-")
+        self.addCleanup(shutil.rmtree, work_dir, True)
+        self.tests_dir = os.path.join(work_dir, "tests")
+        os.mkdir(self.tests_dir)
+        # Outside the tests tree, as in the real layout, so writing it leaves the digest alone
+        manifest_path = os.path.join(work_dir, ".cache", "tests.manifest")
+        patcher = mock.patch.object(run_tests, "MANIFEST_PATH", manifest_path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self._forget_modules, list(sys.path))
+        self.module_names = []
+    
+    def _forget_modules(self, saved_path):
+        """Drop the sample modules and path entries added by discovery"""
+        sys.path[:] = saved_path
+        for name in self.module_names:
+            sys.modules.pop(name, None)
+    
+    def _write_module(self, name, source=SAMPLE_TESTS):
+        # Unique module names, since imported modules outlive each test's directory
+        module_name = f"{name}_{os.path.basename(os.path.dirname(self.tests_dir)).replace('-', '_')}"
+        self.module_names.append(module_name)
+        with open(os.path.join(self.tests_dir, module_name + ".py"), "w", encoding="utf-8") as module_file:
+            module_file.write(source)
+        return module_name
+    
+    def _test_ids(self, suite):
+        return sorted(test.id() for test in run_tests._iter_tests(suite))
+    
+    def test_second_run_loads_cached_ids(self):
+        """Test an unchanged tree loads the recorded test ids without rediscovering"""
+        module_name = self._write_module("test_sample")
+        discovered = self._test_ids(run_tests.load_tests_cached(unittest.TestLoader(), self.tests_dir))
+        self.assertEqual(discovered, [f"{module_name}.TestSample.test_one", f"{module_name}.TestSample.test_two"])
+        self.assertTrue(os.path.exists(run_tests.MANIFEST_PATH))
+        
+        loader = unittest.TestLoader()
+        with mock.patch.object(loader, "discover", side_effect=AssertionError("rediscovered")):
+            cached = self._test_ids(run_tests.load_tests_cached(loader, self.tests_dir))
+        self.assertEqual(cached, discovered)
+    
+    def test_changed_tree_rediscovers(self):
+        """Test adding a test module invalidates the cached ids"""
+        self._write_module("test_sample")
+        run_tests.load_tests_cached(unittest.TestLoader(), self.tests_dir)
+        
+        added_name = self._write_module("test_added")
+        loader = unittest.TestLoader()
+        with mock.patch.object(loader, "discover", wraps=loader.discover) as discover:
+            test_ids = self._test_ids(run_tests.load_tests_cached(loader, self.tests_dir))
+        discover.assert_called_once()
+        self.assertIn(f"{added_name}.TestSample.test_one", test_ids)
+    
+    def test_import_errors_not_cached(self):
+        """Test a discovery that hit import errors does not write a manifest"""
+        self._write_module("test_broken", "import module_that_does_not_exist\n")
+        loader = unittest.TestLoader()
+        run_tests.load_tests_cached(loader, self.tests_dir)
+        self.assertTrue(loader.errors)
+        self.assertFalse(os.path.exists(run_tests.MANIFEST_PATH))
+    
+    def test_unreadable_manifest_ignored(self):
+        """Test a corrupt manifest is treated as a cache miss"""
+        os.makedirs(os.path.dirname(run_tests.MANIFEST_PATH))
+        with open(run_tests.MANIFEST_PATH, "w", encoding="utf-8") as manifest_file:
+            manifest_file.write("not json")
+        self.assertIsNone(run_tests._read_manifest("digest"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+Unit tests for seeding the default rule configurations
+"""
+
+import support
+import asyncio
+import unittest
+from sqlalchemy import delete, func, select
+from database import init_db
+from database.config import AsyncSessionLocal, async_engine
+from database.models import RuleConfiguration
+
+
+class TestSeedDefaultRules(unittest.IsolatedAsyncioTestCase):
+    
+    async def asyncSetUp(self):
+        init_db.init_db()
+        # Pooled connections may belong to another test's event loop
+        await async_engine.dispose()
+        self.addAsyncCleanup(async_engine.dispose)
+        await self._delete_rules()
+        self.addAsyncCleanup(self._delete_rules)
+    
+    async def _delete_rules(self):
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(RuleConfiguration))
+            await db.commit()
+    
+    async def _rule_count(self):
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(func.count()).select_from(RuleConfiguration))).scalar()
+    
+    async def test_seeds_empty_table_once(self):
+        """Test defaults are inserted into an empty table and not again"""
+        self.assertTrue(await init_db.seed_default_rules())
+        self.assertFalse(await init_db.seed_default_rules())
+        self.assertEqual(await self._rule_count(), len(init_db._DEFAULT_RULE_TEMPLATES))
+    
+    async def test_concurrent_seeders_insert_once(self):
+        """Test processes starting together insert the defaults only once"""
+        results = await asyncio.gather(*(init_db.seed_default_rules() for _ in range(4)))
+        self.assertEqual(sorted(results), [False, False, False, True])
+        self.assertEqual(await self._rule_count(), len(init_db._DEFAULT_RULE_TEMPLATES))
+
+
+if __name__ == '__main__':
+    unittest.main()
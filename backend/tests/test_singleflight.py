@@ -0,0 +1,78 @@
+"""
+Unit tests for sharing concurrent identical calls in the API
+"""
+
+import support
+import asyncio
+import unittest
+from api.endpoints import _inflight, _singleflight
+
+
+class TestSingleflight(unittest.IsolatedAsyncioTestCase):
+    
+    async def test_concurrent_callers_share_one_run(self):
+        """Test concurrent callers with the same key share a single call"""
+        calls = []
+        
+        async def work(value):
+            calls.append(value)
+            await asyncio.sleep(0.01)
+            return value * 2
+        
+        results = await asyncio.gather(*(_singleflight(("test", "shared"), work, 21) for _ in range(5)))
+        self.assertEqual(results, [42] * 5)
+        self.assertEqual(calls, [21])
+        self.assertNotIn(("test", "shared"), _inflight)
+    
+    async def test_leader_error_reaches_waiters(self):
+        """Test an exception in the shared call is raised to every caller"""
+        async def work():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+        
+        results = await asyncio.gather(*(_singleflight(("test", "error"), work) for _ in range(3)), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, ValueError) for result in results))
+    
+    async def test_waiters_rerun_when_leader_cancelled(self):
+        """Test waiters run the call themselves instead of failing when the leader is cancelled"""
+        calls = 0
+        started = asyncio.Event()
+        
+        async def work():
+            nonlocal calls
+            calls += 1
+            started.set()
+            await asyncio.sleep(0.01)
+            return "done"
+        
+        leader = asyncio.create_task(_singleflight(("test", "cancel"), work))
+        await started.wait()
+        waiters = [asyncio.create_task(_singleflight(("test", "cancel"), work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        
+        self.assertEqual(await asyncio.gather(*waiters), ["done"] * 3)
+        with self.assertRaises(asyncio.CancelledError):
+            await leader
+        # One cancelled run, then a single shared rerun for the waiters
+        self.assertEqual(calls, 2)
+    
+    async def test_cancelled_waiter_leaves_leader_running(self):
+        """Test cancelling a waiter does not cancel the shared call"""
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+        
+        leader = asyncio.create_task(_singleflight(("test", "waiter"), work))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(_singleflight(("test", "waiter"), work))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+        self.assertEqual(await leader, "done")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+"""
+Unit tests for the tone agent
+"""
+
+import unittest
+from unittest import mock
+from agents.tone_agent import ToneAgent
+
+HTML = "<p>The offer was mailed. The the sale ends soon.</p>"
+
+
+class TestToneIssueCache(unittest.TestCase):
+    
+    def setUp(self):
+        ToneAgent._issue_cache.clear()
+        self.addCleanup(ToneAgent._issue_cache.clear)
+        self.agent = ToneAgent()
+    
+    def test_identical_email_reuses_cached_issues(self):
+        """Test identical content and subject are analyzed once and give equal results"""
+        with mock.patch.object(self.agent, "_analyze_issues", wraps=self.agent._analyze_issues) as analyze:
+            first = self.agent.analyze("e1", HTML, {"subject": "FREE urgent offer"})
+            second = self.agent.analyze("e2", HTML, {"subject": "FREE urgent offer"})
+        analyze.assert_called_once()
+        self.assertEqual(first["issues"], second["issues"])
+        self.assertEqual(second["email_id"], "e2")
+        self.assertEqual({issue["rule"] for issue in first["issues"]}, {"spam_indicators", "grammar"})
+    
+    def test_subject_is_part_of_the_key(self):
+        """Test a different subject is analyzed afresh"""
+        with mock.patch.object(self.agent, "_analyze_issues", wraps=self.agent._analyze_issues) as analyze:
+            spammy = self.agent.analyze("e1", HTML, {"subject": "FREE urgent offer"})
+            plain = self.agent.analyze("e1", HTML, {"subject": "Spring range"})
+        self.assertEqual(analyze.call_count, 2)
+        self.assertNotIn("spam_indicators", {issue["rule"] for issue in plain["issues"]})
+        self.assertIn("spam_indicators", {issue["rule"] for issue in spammy["issues"]})
+    
+    def test_cached_issues_are_independent_copies(self):
+        """Test mutating returned issues does not change the cached issues"""
+        first = self.agent.analyze("e1", HTML, {"subject": ""})
+        first["issues"][0]["description"] = "changed"
+        first["issues"].clear()
+        second = self.agent.analyze("e1", HTML, {"subject": ""})
+        self.assertTrue(second["issues"])
+        self.assertNotEqual(second["issues"][0]["description"], "changed")
+    
+    def test_cached_matches_uncached(self):
+        """Test a cache hit returns the same issues as a direct analysis"""
+        self.agent.analyze("e1", HTML, {"subject": "Act now"})
+        cached = self.agent.analyze("e1", HTML, {"subject": "Act now"})["issues"]
+        self.assertEqual(cached, self.agent._analyze_issues(HTML, "Act now"))
+
+
+if __name__ == '__main__':
+    unittest.main()